@@ -4,16 +4,67 @@
 
 import os
 import json
-from typing import Dict, Any, Optional
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # 未安装orjson时回退到标准库json
+    orjson = None  # type: ignore[assignment]
+
+
+def _env_bool(value: str) -> bool:
+    """解析布尔型环境变量"""
+    return value.lower() == 'true'
+
+
+# 环境变量映射: (环境变量名, 配置分组, 配置键, 类型转换)
+_ENV_MAP = (
+    # 数据库配置
+    ('DB_TYPE', 'database', 'type', str),
+    ('DB_PATH', 'database', 'path', str),
+    # Cloudflare D1 配置
+    ('CF_DATABASE_ID', 'database', 'database_id', str),
+    ('CF_ACCOUNT_ID', 'database', 'account_id', str),
+    ('CF_API_TOKEN', 'database', 'api_token', str),
+    # 邮件配置
+    ('EMAIL_ENABLED', 'email', 'enabled', _env_bool),
+    ('SENDER_EMAIL', 'email', 'sender_email', str),
+    ('EMAIL_PASSWORD', 'email', 'password', str),
+    ('RECIPIENT_EMAIL', 'email', 'recipient_email', str),
+    ('SMTP_SERVER', 'email', 'smtp_server', str),
+    ('SMTP_PORT', 'email', 'smtp_port', int),
+    # Web配置
+    ('WEB_HOST', 'web', 'host', str),
+    ('WEB_PORT', 'web', 'port', int),
+    ('WEB_DEBUG', 'web', 'debug', _env_bool),
+    # 部署配置
+    ('DEPLOYMENT_TYPE', 'deployment', 'type', str),
+    ('ENVIRONMENT', 'deployment', 'environment', str),
+)
+
+
+_MISSING = object()
+
+
+@lru_cache(maxsize=256)
+def _split_key(key: str) -> Tuple[str, ...]:
+    """拆分点号分隔的配置键（结果缓存）"""
+    return tuple(key.split('.'))
+
 
 class ConfigManager:
     """配置管理器 - 统一管理本地和云端配置"""
     
-    def __init__(self, config_path: str = "config.json"):
+    __slots__ = ('config_path', '_config', '_flat', '_flags')
+    
+    def __init__(self, config_path: str = "config.json") -> None:
         self.config_path = config_path
-        self._config = {}
+        self._config: Dict[str, Any] = {}
+        self._flat: Dict[str, Any] = {}
+        self._flags: Dict[str, bool] = {}
         self.load_config()
     
     def load_config(self) -> None:
@@ -25,14 +76,36 @@ class ConfigManager:
         config_file = Path(self.config_path)
         if config_file.exists():
             try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    file_config = json.load(f)
+                raw = config_file.read_bytes()
+                file_config = orjson.loads(raw) if orjson else json.loads(raw)
                 self._merge_config(file_config)
             except Exception as e:
                 print(f"加载配置文件失败: {e}")
         
         # 3. 覆盖环境变量配置
         self._load_from_env()
+        self._rebuild_lookup()
+    
+    def _rebuild_lookup(self) -> None:
+        """生成扁平查找表 {'web.port': 5000, ...} 并预先计算部署类型判断结果"""
+        flat: Dict[str, Any] = {}
+        stack = [('', self._config)]
+        while stack:
+            prefix, node = stack.pop()
+            for key, value in node.items():
+                path = prefix + key
+                if isinstance(value, dict) and value:
+                    stack.append((path + '.', value))
+                else:
+                    flat[path] = value
+        self._flat = flat
+        
+        deployment_type = self.get('deployment.type')
+        self._flags = {
+            'local': deployment_type == 'local',
+            'cloudflare': deployment_type == 'cloudflare',
+            'production': self.get('deployment.environment') == 'production'
+        }
     
     def _get_default_config(self) -> Dict[str, Any]:
         """获取默认配置"""
@@ -47,17 +120,21 @@ class ConfigManager:
                 "password": "", 
                 "recipient_email": "",
                 "smtp_server": "smtp.gmail.com",
-                "smtp_port": 587
+                "smtp_port": 587,
+                "digest_threshold": 3,  # 单轮触发数超过该值时合并为一封汇总邮件
+                "max_per_minute": 30  # 每分钟最多发送的邮件数
             },
             "monitoring": {
                 "check_interval": 300,  # 5分钟
+                "price_refresh_seconds": 30,  # Web界面价格快照刷新间隔
                 "daily_time": "09:30",
                 "timezone": "Asia/Shanghai"
             },
             "web": {
                 "host": "127.0.0.1",
                 "port": 5000,
-                "debug": False
+                "debug": False,
+                "log_file": "web_server.log"  # Web服务错误日志
             },
             "deployment": {
                 "type": "local",  # 'local', 'cloudflare', 'docker'
@@ -66,67 +143,33 @@ class ConfigManager:
         }
     
     def _merge_config(self, new_config: Dict[str, Any]) -> None:
-        """深度合并配置"""
-        def merge_dict(base: Dict, update: Dict) -> Dict:
+        """深度合并配置 - 使用显式栈迭代，避免递归"""
+        stack = deque([(self._config, new_config)])
+        while stack:
+            base, update = stack.pop()
             for key, value in update.items():
-                if key in base and isinstance(base[key], dict) and isinstance(value, dict):
-                    merge_dict(base[key], value)
+                if isinstance(value, dict) and isinstance(base.get(key), dict):
+                    stack.append((base[key], value))
                 else:
                     base[key] = value
-            return base
-        
-        merge_dict(self._config, new_config)
     
     def _load_from_env(self) -> None:
         """从环境变量加载配置"""
-        # 数据库配置
-        if os.getenv('DB_TYPE'):
-            self._config['database']['type'] = os.getenv('DB_TYPE')
-        if os.getenv('DB_PATH'):
-            self._config['database']['path'] = os.getenv('DB_PATH')
-        
-        # Cloudflare D1 配置
-        if os.getenv('CF_DATABASE_ID'):
-            self._config['database']['database_id'] = os.getenv('CF_DATABASE_ID')
-        if os.getenv('CF_ACCOUNT_ID'):
-            self._config['database']['account_id'] = os.getenv('CF_ACCOUNT_ID')
-        if os.getenv('CF_API_TOKEN'):
-            self._config['database']['api_token'] = os.getenv('CF_API_TOKEN')
-        
-        # 邮件配置
-        if os.getenv('EMAIL_ENABLED'):
-            self._config['email']['enabled'] = os.getenv('EMAIL_ENABLED').lower() == 'true'
-        if os.getenv('SENDER_EMAIL'):
-            self._config['email']['sender_email'] = os.getenv('SENDER_EMAIL')
-        if os.getenv('EMAIL_PASSWORD'):
-            self._config['email']['password'] = os.getenv('EMAIL_PASSWORD')
-        if os.getenv('RECIPIENT_EMAIL'):
-            self._config['email']['recipient_email'] = os.getenv('RECIPIENT_EMAIL')
-        if os.getenv('SMTP_SERVER'):
-            self._config['email']['smtp_server'] = os.getenv('SMTP_SERVER')
-        if os.getenv('SMTP_PORT'):
-            self._config['email']['smtp_port'] = int(os.getenv('SMTP_PORT'))
-        
-        # Web配置
-        if os.getenv('WEB_HOST'):
-            self._config['web']['host'] = os.getenv('WEB_HOST')
-        if os.getenv('WEB_PORT'):
-            self._config['web']['port'] = int(os.getenv('WEB_PORT'))
-        if os.getenv('WEB_DEBUG'):
-            self._config['web']['debug'] = os.getenv('WEB_DEBUG').lower() == 'true'
-        
-        # 部署配置
-        if os.getenv('DEPLOYMENT_TYPE'):
-            self._config['deployment']['type'] = os.getenv('DEPLOYMENT_TYPE')
-        if os.getenv('ENVIRONMENT'):
-            self._config['deployment']['environment'] = os.getenv('ENVIRONMENT')
+        env = os.environ
+        for env_key, section, key, convert in _ENV_MAP:
+            value = env.get(env_key)
+            if value:
+                self._config[section][key] = convert(value)
     
     def get(self, key: str, default: Any = None) -> Any:
         """获取配置值 - 支持点号分隔的嵌套键"""
-        keys = key.split('.')
-        value = self._config
+        value = self._flat.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
         
-        for k in keys:
+        # 非叶子键（如 'email'）回退到逐级查找
+        value = self._config
+        for k in _split_key(key):
             if isinstance(value, dict) and k in value:
                 value = value[k]
             else:
@@ -136,7 +179,7 @@ class ConfigManager:
     
     def set(self, key: str, value: Any) -> None:
         """设置配置值"""
-        keys = key.split('.')
+        keys = _split_key(key)
         config = self._config
         
         for k in keys[:-1]:
@@ -145,6 +188,7 @@ class ConfigManager:
             config = config[k]
         
         config[keys[-1]] = value
+        self._rebuild_lookup()
     
     def save(self, config_path: Optional[str] = None) -> None:
         """保存配置到文件"""
@@ -152,8 +196,12 @@ class ConfigManager:
             config_path = self.config_path
         
         try:
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(self._config, f, indent=2, ensure_ascii=False)
+            if orjson:
+                data = orjson.dumps(self._config, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            else:
+                data = json.dumps(self._config, indent=2, ensure_ascii=False).encode('utf-8')
+            with open(config_path, 'wb') as f:
+                f.write(data)
         except Exception as e:
             print(f"保存配置文件失败: {e}")
     
@@ -163,15 +211,15 @@ class ConfigManager:
     
     def is_local_deployment(self) -> bool:
         """判断是否为本地部署"""
-        return self.get('deployment.type') == 'local'
+        return self._flags['local']
     
     def is_cloudflare_deployment(self) -> bool:
         """判断是否为Cloudflare部署"""
-        return self.get('deployment.type') == 'cloudflare'
+        return self._flags['cloudflare']
     
     def is_production(self) -> bool:
         """判断是否为生产环境"""
-        return self.get('deployment.environment') == 'production'
+        return self._flags['production']
 
 
 def create_config_manager(config_path: str = "config.json") -> ConfigManager:
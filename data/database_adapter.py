@@ -4,18 +4,93 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple, cast
 import os
+import sqlite3
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # 未安装orjson时回退到标准库json
+    orjson = None  # type: ignore[assignment]
+    import json
+
+
+_INSERT_PRICE_SQL = '''
+    INSERT INTO price_data (symbol, price, currency, timestamp)
+    VALUES (?, ?, ?, ?)
+'''
+
+_TRIGGER_STRATEGY_SQL = '''
+    UPDATE strategies 
+    SET status = 'triggered', triggered_at = CURRENT_TIMESTAMP 
+    WHERE id = ?
+'''
+_INSERT_NOTIFICATION_SQL = '''
+    INSERT INTO notifications (strategy_id, message)
+    VALUES (?, ?)
+'''
+
+_SELECT_PRICE_CACHE_SQL = '''
+    SELECT payload, expires_at FROM price_cache
+    WHERE key = ? AND expires_at > ?
+'''
+# 批量读取价格缓存: IN 列表按块展开（D1单条语句最多绑定100个参数）
+_SELECT_PRICE_CACHE_MANY_SQL = '''
+    SELECT key, payload, expires_at FROM price_cache
+    WHERE expires_at > ? AND key IN ({placeholders})
+'''
+_PRICE_CACHE_LOOKUP_CHUNK = 90
+_UPSERT_PRICE_CACHE_SQL = '''
+    INSERT OR REPLACE INTO price_cache (key, payload, expires_at)
+    VALUES (?, ?, ?)
+'''
+
+
+def _chunks(items: List[str], size: int) -> List[List[str]]:
+    """按固定大小切分列表"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _price_row(price_data: Dict) -> Tuple[str, float, str, Optional[str]]:
+    """价格数据 -> price_data 表插入参数"""
+    return (
+        price_data['symbol'],
+        price_data['price'],
+        price_data.get('currency', 'USD'),
+        price_data.get('timestamp', None)
+    )
+
+
+def _fetch_dicts(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    """将查询结果转换为字典列表 - 列名只取一次，分批读取避免一次性大分配"""
+    cols = [c[0] for c in cursor.description]
+    cursor.arraysize = 1000
+    rows: List[Dict[str, Any]] = []
+    while batch := cursor.fetchmany():
+        rows.extend(dict(zip(cols, row)) for row in batch)
+    return rows
 
 
 class DatabaseAdapter(ABC):
     """数据库适配器基类"""
     
+    __slots__ = ()
+    
     @abstractmethod
     def connect(self) -> None:
         """建立数据库连接"""
         pass
     
+    @abstractmethod
+    def close(self) -> None:
+        """关闭数据库连接"""
+        pass
+    
     @abstractmethod
     def init_tables(self) -> None:
         """初始化数据库表结构"""
@@ -27,6 +102,11 @@ class DatabaseAdapter(ABC):
         """添加监控策略"""
         pass
     
+    @abstractmethod
+    def add_strategies(self, strategies: List[Tuple[str, str, str, float, str]]) -> List[int]:
+        """批量添加监控策略 (name, symbol, condition_type, target_price, action)，返回策略ID列表"""
+        pass
+    
     @abstractmethod
     def get_active_strategies(self) -> List[Dict]:
         """获取所有活跃策略"""
@@ -37,9 +117,14 @@ class DatabaseAdapter(ABC):
         """标记策略为已触发"""
         pass
     
+    @abstractmethod
+    def batch_trigger_and_notify(self, triggers: List[Tuple[int, str]]) -> None:
+        """批量标记策略已触发并记录通知 (strategy_id, message)"""
+        pass
+    
     @abstractmethod
     def get_strategies_summary(self) -> Dict:
-        """获取策略统计摘要"""
+        """获取策略统计摘要 {total, active, triggered, symbols}（symbols: 活跃策略涉及的标的数）"""
         pass
     
     @abstractmethod
@@ -47,35 +132,86 @@ class DatabaseAdapter(ABC):
         """保存价格数据"""
         pass
     
+    @abstractmethod
+    def save_prices_bulk(self, prices: List[Dict]) -> None:
+        """批量保存价格数据（单个事务）"""
+        pass
+    
     @abstractmethod
     def add_notification(self, strategy_id: int, message: str) -> None:
         """添加通知记录"""
         pass
     
+    @abstractmethod
+    def add_notifications_bulk(self, notifications: List[Tuple[int, str]]) -> None:
+        """批量添加通知记录 (strategy_id, message)"""
+        pass
+    
     @abstractmethod
     def get_recent_notifications(self, limit: int = 20) -> List[Dict]:
         """获取最近的通知记录"""
         pass
+    
+    @abstractmethod
+    def get_cached_price(self, key: str, now: int) -> Optional[Tuple[str, int]]:
+        """读取未过期的价格缓存，返回 (payload, expires_at)"""
+        pass
+    
+    @abstractmethod
+    def get_cached_prices(self, keys: List[str], now: int) -> Dict[str, Tuple[str, int]]:
+        """批量读取未过期的价格缓存，返回 {key: (payload, expires_at)}（只含命中的键）"""
+        pass
+    
+    @abstractmethod
+    def set_cached_prices(self, rows: List[Tuple[str, str, int]]) -> None:
+        """批量写入价格缓存 [(key, payload, expires_at), ...]（同键覆盖）"""
+        pass
 
 
 class SQLiteAdapter(DatabaseAdapter):
     """SQLite数据库适配器 - 用于本地部署"""
     
-    def __init__(self, db_path: str):
+    __slots__ = ('db_path', '_connection', '_lock')
+    
+    def __init__(self, db_path: str) -> None:
         self.db_path = db_path
-        self._connection = None
+        self._connection: Optional[sqlite3.Connection] = None
+        # 连接允许跨线程使用（Web服务器工作线程），写入需串行化
+        self._lock = threading.Lock()
         
     def connect(self) -> None:
-        """建立SQLite连接"""
-        import sqlite3
-        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
-        self._connection.row_factory = sqlite3.Row
+        """建立SQLite连接 - 整个适配器生命周期内复用"""
+        self._connection = self._open_connection()
+    
+    def _open_connection(self) -> sqlite3.Connection:
+        """打开并配置SQLite连接"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # WAL: 读写互不阻塞; mmap + 64MB页缓存: 读取走内存映射
+        conn.executescript('''
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=268435456;
+            PRAGMA cache_size=-65536;
+        ''')
+        return conn
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        """获取持久连接，未连接时自动建立"""
+        if self._connection is None:
+            self._connection = self._open_connection()
+        return self._connection
+    
+    def close(self) -> None:
+        """关闭SQLite连接"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
         
     def init_tables(self) -> None:
         """初始化SQLite表结构"""
-        import sqlite3
-        
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._get_connection() as conn:
             cursor = conn.cursor()
             
             # 策略表
@@ -115,60 +251,86 @@ class SQLiteAdapter(DatabaseAdapter):
                 )
             ''')
             
-            conn.commit()
+            # 价格缓存表（跨进程/重启复用行情数据）
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS price_cache (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    expires_at INTEGER NOT NULL
+                )
+            ''')
+            
+            # 热点查询索引
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_strategies_status_created
+                ON strategies(status, created_at DESC)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_notifications_sent_at
+                ON notifications(sent_at DESC)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_price_data_symbol_timestamp
+                ON price_data(symbol, timestamp DESC)
+            ''')
     
     def add_strategy(self, name: str, symbol: str, condition_type: str, 
                     target_price: float, action: str) -> int:
         """添加监控策略"""
-        import sqlite3
-        
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
+        with self._lock, self._get_connection() as conn:
+            cursor = conn.execute('''
                 INSERT INTO strategies (name, symbol, condition_type, target_price, action)
                 VALUES (?, ?, ?, ?, ?)
             ''', (name, symbol, condition_type, target_price, action))
             
-            return cursor.lastrowid
+            return cast(int, cursor.lastrowid)
+    
+    def add_strategies(self, strategies: List[Tuple[str, str, str, float, str]]) -> List[int]:
+        """批量添加监控策略（单个事务，逐条取回自增ID）"""
+        if not strategies:
+            return []
+        
+        with self._lock, self._get_connection() as conn:
+            sql = '''
+                INSERT INTO strategies (name, symbol, condition_type, target_price, action)
+                VALUES (?, ?, ?, ?, ?)
+            '''
+            return [cast(int, conn.execute(sql, row).lastrowid) for row in strategies]
     
     def get_active_strategies(self) -> List[Dict]:
         """获取所有活跃策略"""
-        import sqlite3
-        
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('''
+        with self._lock:
+            cursor = self._get_connection().execute('''
                 SELECT * FROM strategies 
                 WHERE status = 'active' 
                 ORDER BY created_at DESC
             ''')
             
-            return [dict(row) for row in cursor.fetchall()]
+            return _fetch_dicts(cursor)
     
     def trigger_strategy(self, strategy_id: int) -> None:
         """标记策略为已触发"""
-        import sqlite3
+        with self._lock, self._get_connection() as conn:
+            conn.execute(_TRIGGER_STRATEGY_SQL, (strategy_id,))
+    
+    def batch_trigger_and_notify(self, triggers: List[Tuple[int, str]]) -> None:
+        """批量标记策略已触发并记录通知（单个事务）"""
+        if not triggers:
+            return
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                UPDATE strategies 
-                SET status = 'triggered', triggered_at = CURRENT_TIMESTAMP 
-                WHERE id = ?
-            ''', (strategy_id,))
+        with self._lock, self._get_connection() as conn:
+            conn.executemany(_TRIGGER_STRATEGY_SQL, [(strategy_id,) for strategy_id, _ in triggers])
+            conn.executemany(_INSERT_NOTIFICATION_SQL, triggers)
     
     def get_strategies_summary(self) -> Dict:
         """获取策略统计摘要"""
-        import sqlite3
-        
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
+        with self._lock:
+            cursor = self._get_connection().execute('''
                 SELECT 
                     COUNT(*) as total,
                     COUNT(CASE WHEN status = 'active' THEN 1 END) as active,
-                    COUNT(CASE WHEN status = 'triggered' THEN 1 END) as triggered
+                    COUNT(CASE WHEN status = 'triggered' THEN 1 END) as triggered,
+                    COUNT(DISTINCT CASE WHEN status = 'active' THEN symbol END) as symbols
                 FROM strategies
             ''')
             
@@ -176,125 +338,186 @@ class SQLiteAdapter(DatabaseAdapter):
             return {
                 'total': row[0],
                 'active': row[1], 
-                'triggered': row[2]
+                'triggered': row[2],
+                'symbols': row[3]
             }
     
     def save_price(self, price_data: Dict) -> None:
         """保存价格数据"""
-        import sqlite3
+        with self._lock, self._get_connection() as conn:
+            conn.execute(_INSERT_PRICE_SQL, _price_row(price_data))
+    
+    def save_prices_bulk(self, prices: List[Dict]) -> None:
+        """批量保存价格数据（单个事务）"""
+        if not prices:
+            return
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO price_data (symbol, price, currency, timestamp)
-                VALUES (?, ?, ?, ?)
-            ''', (
-                price_data['symbol'],
-                price_data['price'],
-                price_data.get('currency', 'USD'),
-                price_data.get('timestamp', None)
-            ))
+        with self._lock, self._get_connection() as conn:
+            conn.executemany(_INSERT_PRICE_SQL, [_price_row(p) for p in prices])
     
     def add_notification(self, strategy_id: int, message: str) -> None:
         """添加通知记录"""
-        import sqlite3
+        with self._lock, self._get_connection() as conn:
+            conn.execute(_INSERT_NOTIFICATION_SQL, (strategy_id, message))
+    
+    def add_notifications_bulk(self, notifications: List[Tuple[int, str]]) -> None:
+        """批量添加通知记录（单个事务）"""
+        if not notifications:
+            return
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO notifications (strategy_id, message)
-                VALUES (?, ?)
-            ''', (strategy_id, message))
+        with self._lock, self._get_connection() as conn:
+            conn.executemany(_INSERT_NOTIFICATION_SQL, notifications)
     
     def get_recent_notifications(self, limit: int = 20) -> List[Dict]:
         """获取最近的通知记录"""
-        import sqlite3
-        
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT n.message, n.sent_at, s.name as strategy_name
+        with self._lock:
+            cursor = self._get_connection().execute('''
+                SELECT n.id, n.message, n.sent_at, s.name as strategy_name
                 FROM notifications n
                 LEFT JOIN strategies s ON n.strategy_id = s.id
-                ORDER BY n.sent_at DESC
+                ORDER BY n.sent_at DESC, n.id DESC
                 LIMIT ?
             ''', (limit,))
             
-            return [dict(row) for row in cursor.fetchall()]
+            return _fetch_dicts(cursor)
+    
+    def get_cached_price(self, key: str, now: int) -> Optional[Tuple[str, int]]:
+        """读取未过期的价格缓存"""
+        with self._lock:
+            return self._get_connection().execute(_SELECT_PRICE_CACHE_SQL, (key, now)).fetchone()
+    
+    def get_cached_prices(self, keys: List[str], now: int) -> Dict[str, Tuple[str, int]]:
+        """批量读取未过期的价格缓存（每块一次查询）"""
+        hits: Dict[str, Tuple[str, int]] = {}
+        with self._lock:
+            conn = self._get_connection()
+            for chunk in _chunks(keys, _PRICE_CACHE_LOOKUP_CHUNK):
+                sql = _SELECT_PRICE_CACHE_MANY_SQL.format(placeholders=', '.join('?' * len(chunk)))
+                for key, payload, expires_at in conn.execute(sql, (now, *chunk)):
+                    hits[key] = (payload, expires_at)
+        return hits
+    
+    def set_cached_prices(self, rows: List[Tuple[str, str, int]]) -> None:
+        """批量写入价格缓存（一个事务）"""
+        if not rows:
+            return
+        with self._lock, self._get_connection() as conn:
+            conn.executemany(_UPSERT_PRICE_CACHE_SQL, rows)
 
 
 class CloudflareD1Adapter(DatabaseAdapter):
     """Cloudflare D1 数据库适配器 - 用于云端部署"""
     
-    def __init__(self, database_id: str, account_id: str, api_token: str):
+    __slots__ = ('database_id', 'account_id', 'api_token', 'base_url', '_session')
+    
+    def __init__(self, database_id: str, account_id: str, api_token: str) -> None:
         self.database_id = database_id
         self.account_id = account_id  
         self.api_token = api_token
         self.base_url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/d1/database/{database_id}"
+        
+        # 复用HTTP会话，避免每次查询都重新进行TCP+TLS握手
+        self._session = requests.Session()
+        self._session.headers.update({
+            'Authorization': f'Bearer {self.api_token}',
+            'Content-Type': 'application/json'
+        })
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16,
+                              max_retries=Retry(total=3, backoff_factor=0.3))
+        self._session.mount('https://', adapter)
     
     def connect(self) -> None:
         """D1 连接验证"""
-        # D1 是 HTTP API，无需持久连接
+        # D1 是 HTTP API，连接由 self._session 的连接池维护
         pass
     
-    def _execute_query(self, sql: str, params: List[Any] = None) -> Dict:
-        """执行 D1 SQL 查询"""
-        import requests
-        
-        headers = {
-            'Authorization': f'Bearer {self.api_token}',
-            'Content-Type': 'application/json'
-        }
+    def close(self) -> None:
+        """关闭HTTP会话及其连接池"""
+        self._session.close()
+    
+    def _post_query(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """向 D1 /query 端点提交请求"""
+        response = self._session.post(f"{self.base_url}/query", json=payload)
+        response.raise_for_status()
         
-        payload = {
+        return orjson.loads(response.content) if orjson else json.loads(response.content)
+    
+    def _execute_query(self, sql: str, params: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """执行 D1 SQL 查询"""
+        return self._post_query({
             'sql': sql,
             'params': params or []
-        }
-        
-        response = requests.post(f"{self.base_url}/query", headers=headers, json=payload)
-        response.raise_for_status()
-        
-        return response.json()
+        })
+    
+    def _execute_batch(self, statements: List[Tuple[str, List[Any]]]) -> Dict[str, Any]:
+        """在一次HTTP请求中执行多条 D1 SQL 语句"""
+        return self._post_query({
+            'batch': [{'sql': sql, 'params': params or []} for sql, params in statements]
+        })
     
     def init_tables(self) -> None:
-        """初始化 D1 表结构"""
-        # 策略表
-        self._execute_query('''
-            CREATE TABLE IF NOT EXISTS strategies (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                symbol TEXT NOT NULL,
-                condition_type TEXT NOT NULL,
-                target_price REAL NOT NULL,
-                action TEXT NOT NULL,
-                status TEXT DEFAULT 'active',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                triggered_at TIMESTAMP
-            )
-        ''')
-        
-        # 价格数据表
-        self._execute_query('''
-            CREATE TABLE IF NOT EXISTS price_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                symbol TEXT NOT NULL,
-                price REAL NOT NULL,
-                currency TEXT DEFAULT 'USD',
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 通知记录表
-        self._execute_query('''
-            CREATE TABLE IF NOT EXISTS notifications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                strategy_id INTEGER,
-                message TEXT NOT NULL,
-                sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (strategy_id) REFERENCES strategies (id)
-            )
-        ''')
+        """初始化 D1 表结构 - 所有DDL在一次请求中执行"""
+        self._execute_batch([
+            # 策略表
+            ('''
+                CREATE TABLE IF NOT EXISTS strategies (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    condition_type TEXT NOT NULL,
+                    target_price REAL NOT NULL,
+                    action TEXT NOT NULL,
+                    status TEXT DEFAULT 'active',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    triggered_at TIMESTAMP
+                )
+            ''', []),
+            
+            # 价格数据表
+            ('''
+                CREATE TABLE IF NOT EXISTS price_data (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    symbol TEXT NOT NULL,
+                    price REAL NOT NULL,
+                    currency TEXT DEFAULT 'USD',
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''', []),
+            
+            # 通知记录表
+            ('''
+                CREATE TABLE IF NOT EXISTS notifications (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    strategy_id INTEGER,
+                    message TEXT NOT NULL,
+                    sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (strategy_id) REFERENCES strategies (id)
+                )
+            ''', []),
+            
+            # 价格缓存表（跨进程/重启复用行情数据）
+            ('''
+                CREATE TABLE IF NOT EXISTS price_cache (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    expires_at INTEGER NOT NULL
+                )
+            ''', []),
+            
+            # 热点查询索引
+            ('''
+                CREATE INDEX IF NOT EXISTS idx_strategies_status_created
+                ON strategies(status, created_at DESC)
+            ''', []),
+            ('''
+                CREATE INDEX IF NOT EXISTS idx_notifications_sent_at
+                ON notifications(sent_at DESC)
+            ''', []),
+            ('''
+                CREATE INDEX IF NOT EXISTS idx_price_data_symbol_timestamp
+                ON price_data(symbol, timestamp DESC)
+            ''', []),
+        ])
     
     def add_strategy(self, name: str, symbol: str, condition_type: str, 
                     target_price: float, action: str) -> int:
@@ -306,6 +529,18 @@ class CloudflareD1Adapter(DatabaseAdapter):
         
         return result['result'][0]['meta']['last_row_id']
     
+    def add_strategies(self, strategies: List[Tuple[str, str, str, float, str]]) -> List[int]:
+        """批量添加监控策略（单次HTTP请求）"""
+        if not strategies:
+            return []
+        
+        sql = '''
+            INSERT INTO strategies (name, symbol, condition_type, target_price, action)
+            VALUES (?, ?, ?, ?, ?)
+        '''
+        result = self._execute_batch([(sql, list(row)) for row in strategies])
+        return [item['meta']['last_row_id'] for item in result['result']]
+    
     def get_active_strategies(self) -> List[Dict]:
         """获取所有活跃策略"""
         result = self._execute_query('''
@@ -318,11 +553,18 @@ class CloudflareD1Adapter(DatabaseAdapter):
     
     def trigger_strategy(self, strategy_id: int) -> None:
         """标记策略为已触发"""
-        self._execute_query('''
-            UPDATE strategies 
-            SET status = 'triggered', triggered_at = CURRENT_TIMESTAMP 
-            WHERE id = ?
-        ''', [strategy_id])
+        self._execute_query(_TRIGGER_STRATEGY_SQL, [strategy_id])
+    
+    def batch_trigger_and_notify(self, triggers: List[Tuple[int, str]]) -> None:
+        """批量标记策略已触发并记录通知（单次HTTP请求）"""
+        if not triggers:
+            return
+        
+        statements: List[Tuple[str, List[Any]]] = [
+            (_TRIGGER_STRATEGY_SQL, [strategy_id]) for strategy_id, _ in triggers
+        ]
+        statements += [(_INSERT_NOTIFICATION_SQL, [strategy_id, message]) for strategy_id, message in triggers]
+        self._execute_batch(statements)
     
     def get_strategies_summary(self) -> Dict:
         """获取策略统计摘要"""
@@ -330,7 +572,8 @@ class CloudflareD1Adapter(DatabaseAdapter):
             SELECT 
                 COUNT(*) as total,
                 COUNT(CASE WHEN status = 'active' THEN 1 END) as active,
-                COUNT(CASE WHEN status = 'triggered' THEN 1 END) as triggered
+                COUNT(CASE WHEN status = 'triggered' THEN 1 END) as triggered,
+                COUNT(DISTINCT CASE WHEN status = 'active' THEN symbol END) as symbols
             FROM strategies
         ''')
         
@@ -338,7 +581,8 @@ class CloudflareD1Adapter(DatabaseAdapter):
         return {
             'total': row['total'],
             'active': row['active'], 
-            'triggered': row['triggered']
+            'triggered': row['triggered'],
+            'symbols': row['symbols']
         }
     
     def save_price(self, price_data: Dict) -> None:
@@ -346,34 +590,69 @@ class CloudflareD1Adapter(DatabaseAdapter):
         self._execute_query('''
             INSERT INTO price_data (symbol, price, currency, timestamp)
             VALUES (?, ?, ?, ?)
-        ''', [
-            price_data['symbol'],
-            price_data['price'],
-            price_data.get('currency', 'USD'),
-            price_data.get('timestamp', None)
-        ])
+        ''', list(_price_row(price_data)))
+    
+    def save_prices_bulk(self, prices: List[Dict]) -> None:
+        """批量保存价格数据（单次HTTP请求）"""
+        if not prices:
+            return
+        
+        sql = '''
+            INSERT INTO price_data (symbol, price, currency, timestamp)
+            VALUES (?, ?, ?, ?)
+        '''
+        self._execute_batch([(sql, list(_price_row(p))) for p in prices])
     
     def add_notification(self, strategy_id: int, message: str) -> None:
         """添加通知记录"""
-        self._execute_query('''
-            INSERT INTO notifications (strategy_id, message)
-            VALUES (?, ?)
-        ''', [strategy_id, message])
+        self._execute_query(_INSERT_NOTIFICATION_SQL, [strategy_id, message])
+    
+    def add_notifications_bulk(self, notifications: List[Tuple[int, str]]) -> None:
+        """批量添加通知记录（单次HTTP请求）"""
+        if not notifications:
+            return
+        
+        self._execute_batch([(_INSERT_NOTIFICATION_SQL, [strategy_id, message])
+                             for strategy_id, message in notifications])
     
     def get_recent_notifications(self, limit: int = 20) -> List[Dict]:
         """获取最近的通知记录"""
         result = self._execute_query('''
-            SELECT n.message, n.sent_at, s.name as strategy_name
+            SELECT n.id, n.message, n.sent_at, s.name as strategy_name
             FROM notifications n
             LEFT JOIN strategies s ON n.strategy_id = s.id
-            ORDER BY n.sent_at DESC
+            ORDER BY n.sent_at DESC, n.id DESC
             LIMIT ?
         ''', [limit])
         
         return result['result'][0]['results']
+    
+    def get_cached_price(self, key: str, now: int) -> Optional[Tuple[str, int]]:
+        """读取未过期的价格缓存"""
+        result = self._execute_query(_SELECT_PRICE_CACHE_SQL, [key, now])
+        rows = result['result'][0]['results']
+        if not rows:
+            return None
+        return rows[0]['payload'], rows[0]['expires_at']
+    
+    def get_cached_prices(self, keys: List[str], now: int) -> Dict[str, Tuple[str, int]]:
+        """批量读取未过期的价格缓存（每块一次HTTP请求）"""
+        hits: Dict[str, Tuple[str, int]] = {}
+        for chunk in _chunks(keys, _PRICE_CACHE_LOOKUP_CHUNK):
+            sql = _SELECT_PRICE_CACHE_MANY_SQL.format(placeholders=', '.join('?' * len(chunk)))
+            result = self._execute_query(sql, [now, *chunk])
+            for row in result['result'][0]['results']:
+                hits[row['key']] = (row['payload'], row['expires_at'])
+        return hits
+    
+    def set_cached_prices(self, rows: List[Tuple[str, str, int]]) -> None:
+        """批量写入价格缓存（一次HTTP请求）"""
+        if not rows:
+            return
+        self._execute_batch([(_UPSERT_PRICE_CACHE_SQL, list(row)) for row in rows])
 
 
-def create_database_adapter(config: Dict) -> DatabaseAdapter:
+def create_database_adapter(config: Dict[str, Any]) -> DatabaseAdapter:
     """数据库适配器工厂方法"""
     adapter_type = config.get('database', {}).get('type', 'sqlite')
     
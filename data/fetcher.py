@@ -1,177 +1,366 @@
+import asyncio
+import functools
+import hashlib
+import sys
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+try:
+    import orjson
+except ImportError:  # 未安装orjson时回退到标准库json
+    orjson = None
+    import json
+
+
+if TYPE_CHECKING:
+    from data.storage import Database
+
+
+# 行情缓存最多保留的标的数（LRU淘汰）
+_QUOTE_CACHE_SIZE = 256
+
+# 未安装aiohttp时线程池回退的最大并发数
+_MAX_FETCH_WORKERS = 16
+
+# Pyodide (Cloudflare Worker) 等环境不支持线程，只能逐个顺序获取
+_THREADS_AVAILABLE = sys.platform != 'emscripten'
+
+_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+# 每个请求携带的公共请求头（不依赖Session默认头，会话可安全共享）
+_REQUEST_HEADERS = MappingProxyType({
+    'User-Agent': _USER_AGENT,
+    'Accept-Encoding': 'gzip, deflate'
+})
+
+def _loads(raw: bytes) -> Any:
+    """解析HTTP响应体（bytes）"""
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def _dumps(data: Any) -> str:
+    """序列化价格数据（写入持久化缓存）"""
+    return orjson.dumps(data).decode('utf-8') if orjson else json.dumps(data, ensure_ascii=False)
+
+
+def _price_cache_key(kind: str, symbol: str) -> str:
+    """持久化价格缓存的键: sha1(行情类型|代码)"""
+    return hashlib.sha1(f"{kind}|{symbol}".encode('utf-8')).hexdigest()
+
+
+def _now_ts() -> str:
+    """当前本地时间戳字符串"""
+    return datetime.now().isoformat(sep=' ', timespec='seconds')
+
+
+# Yahoo chart接口只取meta即可，限定1天/日线让服务端少返回价格序列
+_YAHOO_CHART_PARAMS = '?range=1d&interval=1d'
+# Yahoo chart接口主备域名，主域名失败时换备用域名重试
+_YAHOO_CHART_URLS = (
+    'https://query1.finance.yahoo.com/v8/finance/chart/',
+    'https://query2.finance.yahoo.com/v8/finance/chart/',
+)
+
+
+def _parse_yahoo_meta(data: Dict) -> Optional[Dict]:
+    """从Yahoo Finance chart响应中取出meta（含最新价格），无价格时返回None"""
+    if 'chart' in data and 'result' in data['chart'] and data['chart']['result']:
+        result = data['chart']['result'][0]
+        if 'meta' in result and 'regularMarketPrice' in result['meta']:
+            return result['meta']
+    return None
+
+
+def _parse_yahoo_btc(data: Dict) -> Optional[float]:
+    meta = _parse_yahoo_meta(data)
+    return float(meta['regularMarketPrice']) if meta else None
+
+
+# 演示数据（只读）
+_HK_DEMO_PRICES = MappingProxyType({'0700.HK': 320.50, '0941.HK': 45.20, '2318.HK': 52.80})
+_HK_DEMO_NAMES = MappingProxyType({'0700.HK': '腾讯控股', '0941.HK': '中国移动', '2318.HK': '中国平安'})
+_US_DEMO_PRICES = MappingProxyType({'AAPL': 175.84, 'MSFT': 428.39, 'GOOGL': 164.72, 'TSLA': 248.50})
+_US_DEMO_NAMES = MappingProxyType({'AAPL': 'Apple Inc.', 'MSFT': 'Microsoft Corp',
+                                   'GOOGL': 'Alphabet Inc', 'TSLA': 'Tesla Inc'})
+# (价格表, 名称表, 币种, 未知代码的默认价格)
+_HK_DEMO = (_HK_DEMO_PRICES, _HK_DEMO_NAMES, 'HKD', 100.0)
+_US_DEMO = (_US_DEMO_PRICES, _US_DEMO_NAMES, 'USD', 150.0)
+_DEMO_SUFFIX = ' (演示数据)'
+
+
+_BINANCE_BTC_URL = 'https://api.binance.com/api/v3/ticker/price?symbol=BTCUSDT'
+_COINGECKO_BTC_URL = 'https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd'
+_YAHOO_BTC_URL = _YAHOO_CHART_URLS[0] + 'BTC-USD' + _YAHOO_CHART_PARAMS
+
+# BTC价格数据源，按优先级排列: (名称, URL, 超时, 价格解析函数)
+_BTC_SOURCES = (
+    # 方法1: Binance API (通常更稳定)
+    ('Binance', _BINANCE_BTC_URL, 8,
+     lambda data: float(data['price'])),
+    # 方法2: CoinGecko API
+    ('CoinGecko', _COINGECKO_BTC_URL, 8,
+     lambda data: float(data['bitcoin']['usd'])),
+    # 方法3: Yahoo Finance (BTC-USD)
+    ('Yahoo Finance BTC', _YAHOO_BTC_URL, 8,
+     _parse_yahoo_btc),
+)
 
 
 class DataFetcher:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        })
+    __slots__ = ('session', '_connector_options', '_asession', '_http_cache', '_quote_cache',
+                 '_cache_lock', '_ttl', '_store')
     
-    def get_stock_price(self, symbol: str) -> Optional[Dict]:
+    def __init__(self, cache_ttl: Optional[float] = None, store: Optional['Database'] = None):
         """
-        获取股票价格 - 首先尝试Yahoo Finance API，失败则用演示数据
-        港股: 0700.HK (腾讯)  
-        美股: AAPL
+        Args:
+            cache_ttl: 行情缓存有效期（秒），为None时股票15秒、BTC 30秒
+            store: 持久化价格缓存（如 Database），进程重启后仍可命中
         """
-        # 首先尝试Yahoo Finance直接API
+        self.session = requests.Session()
+        # 连接池复用Yahoo/Binance/CoinGecko的TLS连接，并对限流/服务端错误自动重试
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.3,
+                              status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # 异步批量获取使用的连接池参数（keep-alive + DNS缓存）
+        self._connector_options = {'limit': 100, 'limit_per_host': 20, 'ttl_dns_cache': 300}
+        # async with 期间复用的aiohttp会话（连接池与DNS缓存跨批次保留）
+        self._asession = None
+        # URL -> (ETag, Last-Modified, JSON数据)，用于条件请求
+        self._http_cache: Dict[str, tuple] = {}
+        # 行情缓存（有界LRU）: symbol -> (过期时间, 价格数据)
+        self._quote_cache: 'OrderedDict[str, tuple]' = OrderedDict()
+        # 线程池回退及Web工作线程会并发读写行情缓存
+        self._cache_lock = threading.Lock()
+        # 各类行情的缓存有效期（秒）
+        if cache_ttl is None:
+            self._ttl = {'quote': 15.0, 'btc': 30.0}
+        else:
+            self._ttl = {'quote': float(cache_ttl), 'btc': float(cache_ttl)}
+        self._store = store
+    
+    def _get_json(self, url: str, timeout: float) -> Any:
+        """GET并解析JSON - 携带上次响应的ETag/Last-Modified做条件请求"""
+        # 校验头与304时返回的数据取自同一个缓存条目，期间缓存被替换也不会错配
+        cached = self._http_cache.get(url)
+        response = self.session.get(url, timeout=timeout, headers=self._request_headers(cached))
+        if response.status_code == 304:
+            return self._not_modified_data(url, cached)
+        
+        response.raise_for_status()
+        data = _loads(response.content)
+        self._store_http_cache(url, response.headers, data)
+        return data
+    
+    def _request_headers(self, cached: Optional[tuple]) -> Dict[str, str]:
+        """构建请求头 - 公共请求头加上缓存条目 (etag, last_modified, data) 的校验头"""
+        headers = dict(_REQUEST_HEADERS)
+        if cached is None:
+            return headers
+        
+        etag, last_modified, _ = cached
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+    
+    @staticmethod
+    def _not_modified_data(url: str, cached: Optional[tuple]) -> Any:
+        """304响应 - 返回发送校验头时所用缓存条目的数据；未发送校验头时304无数据可用"""
+        if cached is None:
+            raise ValueError(f"未发送条件请求却收到304响应: {url}")
+        return cached[2]
+    
+    def _store_http_cache(self, url: str, headers, data: Any) -> None:
+        """缓存响应数据及其校验头（服务端未提供校验头时不缓存）"""
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if etag or last_modified:
+            self._http_cache[url] = (etag, last_modified, data)
+    
+    def _get_cached_quote(self, key: str, kind: str, use_store: bool = True) -> Optional[Dict]:
+        """读取未过期的行情 - 先查内存缓存，再查持久化缓存（use_store=False时只查内存）"""
+        with self._cache_lock:
+            hit = self._quote_cache.get(key)
+            if hit is not None:
+                if time.monotonic() < hit[0]:
+                    self._quote_cache.move_to_end(key)
+                    return hit[1]
+                del self._quote_cache[key]
+        
+        if self._store is None or not use_store:
+            return None
+        
         try:
-            # 使用Yahoo Finance查询API
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            if 'chart' in data and 'result' in data['chart'] and data['chart']['result']:
-                result = data['chart']['result'][0]
-                
-                # 获取最新价格
-                if 'meta' in result and 'regularMarketPrice' in result['meta']:
-                    current_price = float(result['meta']['regularMarketPrice'])
-                    currency = result['meta'].get('currency', 'USD')
-                    stock_name = result['meta'].get('longName', symbol)
-                    
-                    return {
-                        'symbol': symbol,
-                        'price': current_price,
-                        'currency': currency,
-                        'name': stock_name,
-                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    }
+            cached = self._store.get_cached_price(_price_cache_key(kind, key), int(time.time()))
         except Exception as e:
-            print(f"Yahoo Finance API失败: {e}")
+            print(f"读取价格缓存失败: {e}")
+            return None
+        if cached is None:
+            return None
+        
+        # 持久化缓存命中，按剩余有效期放入内存缓存
+        payload, expires_at = cached
+        data = _loads(payload)
+        self._remember_quote(key, data, expires_at - time.time())
+        return data
+    
+    def _preload_cached_quotes(self, symbols: List[str]) -> None:
+        """批量预读持久化缓存: 内存中没有的标的一次查询取回，命中的放入内存缓存"""
+        if self._store is None:
+            return
+        
+        now = time.monotonic()
+        with self._cache_lock:
+            cache = self._quote_cache
+            wanted = {}
+            for symbol in symbols:
+                key, kind = ('BTC-USD', 'btc') if symbol.upper().startswith('BTC') else (symbol, 'quote')
+                hit = cache.get(key)
+                if hit is None or hit[0] <= now:
+                    wanted[_price_cache_key(kind, key)] = key
+        
+        if not wanted:
+            return
         
-        # 如果Yahoo Finance失败，尝试yfinance
         try:
-            import yfinance as yf
-            
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period="1d")
-            
-            if not hist.empty:
-                current_price = float(hist['Close'].iloc[-1])
-                
-                try:
-                    info = ticker.info
-                    stock_name = info.get('longName', symbol)
-                    currency = info.get('currency', 'USD')
-                except:
-                    stock_name = symbol
-                    currency = 'HKD' if symbol.endswith('.HK') else 'USD'
-                
-                return {
-                    'symbol': symbol,
-                    'price': current_price,
-                    'currency': currency,
-                    'name': stock_name,
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
+            cached = self._store.get_cached_prices(list(wanted), int(time.time()))
         except Exception as e:
-            print(f"yfinance也失败: {e}")
+            print(f"读取价格缓存失败: {e}")
+            return
+        
+        for cache_key, (payload, expires_at) in cached.items():
+            self._remember_quote(wanted[cache_key], _loads(payload), expires_at - time.time())
+    
+    def _cache_quote(self, key: str, kind: str, data: Dict,
+                     pending: Optional[List[Tuple[str, str, int]]] = None) -> Dict:
+        """
+        写入行情缓存（内存 + 持久化），有效期按行情类型 ('quote' / 'btc') 决定
+        
+        pending不为None时持久化行只追加到其中，由批量获取结束后一次写入
+        """
+        ttl = self._ttl[kind]
+        self._remember_quote(key, data, ttl)
+        
+        if self._store is not None:
+            row = (_price_cache_key(kind, key), _dumps(data), int(time.time() + ttl))
+            if pending is None:
+                self._persist_quotes([row])
+            else:
+                pending.append(row)
+        return data
+    
+    def _persist_quotes(self, rows: List[Tuple[str, str, int]]) -> None:
+        """批量写入持久化行情缓存（一次存储调用）"""
+        if self._store is None or not rows:
+            return
+        try:
+            self._store.set_cached_prices(rows)
+        except Exception as e:
+            print(f"写入价格缓存失败: {e}")
+    
+    def _remember_quote(self, key: str, data: Dict, ttl: float) -> None:
+        """写入内存行情缓存，超出容量时淘汰最久未用的标的"""
+        cache = self._quote_cache
+        with self._cache_lock:
+            cache[key] = (time.monotonic() + ttl, data)
+            cache.move_to_end(key)
+            if len(cache) > _QUOTE_CACHE_SIZE:
+                cache.popitem(last=False)
+    
+    def get_stock_price(self, symbol: str, use_store: bool = True,
+                        pending: Optional[List[Tuple[str, str, int]]] = None) -> Optional[Dict]:
+        """
+        获取股票价格 - 尝试Yahoo Finance API（主备域名），失败则用演示数据
+        港股: 0700.HK (腾讯)  
+        美股: AAPL
+        """
+        cached = self._get_cached_quote(symbol, 'quote', use_store)
+        if cached:
+            return cached
+        
+        # 依次尝试Yahoo Finance主备域名
+        for base_url in _YAHOO_CHART_URLS:
+            try:
+                url = base_url + symbol + _YAHOO_CHART_PARAMS
+                result = self._build_stock_price(symbol, self._get_json(url, 10))
+                if result:
+                    return self._cache_quote(symbol, 'quote', result, pending)
+            except Exception as e:
+                print(f"Yahoo Finance API失败 ({base_url}): {e}")
         
         # 所有方法都失败，使用演示数据
         print(f"获取股票 {symbol} 真实数据失败，使用演示数据")
         return self._get_demo_price(symbol)
     
-    def _get_demo_price(self, symbol: str) -> Optional[Dict]:
-        """演示数据回退方案"""
-        try:
-            if symbol.endswith('.HK'):
-                # 港股演示数据
-                demo_prices = {'0700.HK': 320.50, '0941.HK': 45.20, '2318.HK': 52.80}
-                price = demo_prices.get(symbol, 100.0)
-                name_map = {'0700.HK': '腾讯控股', '0941.HK': '中国移动', '2318.HK': '中国平安'}
-                
-                return {
-                    'symbol': symbol,
-                    'price': price,
-                    'currency': 'HKD',
-                    'name': name_map.get(symbol, symbol),
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S') + ' (演示数据)'
-                }
-            else:
-                # 美股演示数据  
-                demo_prices = {'AAPL': 175.84, 'MSFT': 428.39, 'GOOGL': 164.72, 'TSLA': 248.50}
-                price = demo_prices.get(symbol, 150.0)
-                name_map = {'AAPL': 'Apple Inc.', 'MSFT': 'Microsoft Corp', 'GOOGL': 'Alphabet Inc', 'TSLA': 'Tesla Inc'}
-                
-                return {
-                    'symbol': symbol,
-                    'price': price,
-                    'currency': 'USD',
-                    'name': name_map.get(symbol, symbol),
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S') + ' (演示数据)'
-                }
-        except Exception as e:
-            print(f"获取演示数据失败: {e}")
+    def _build_stock_price(self, symbol: str, data: Dict,
+                           timestamp: Optional[str] = None) -> Optional[Dict]:
+        """由Yahoo Finance chart响应构建价格数据"""
+        meta = _parse_yahoo_meta(data)
+        if not meta:
             return None
+        
+        return {
+            'symbol': symbol,
+            'price': float(meta['regularMarketPrice']),
+            'currency': meta.get('currency', 'USD'),
+            'name': meta.get('longName', symbol),
+            'timestamp': timestamp or _now_ts()
+        }
+    
+    def _get_demo_price(self, symbol: str, timestamp: Optional[str] = None) -> Optional[Dict]:
+        """演示数据回退方案"""
+        # 港股 / 美股演示数据
+        prices, names, currency, default_price = _HK_DEMO if symbol.endswith('.HK') else _US_DEMO
+        return {
+            'symbol': symbol,
+            'price': prices.get(symbol, default_price),
+            'currency': currency,
+            'name': names.get(symbol, symbol),
+            'timestamp': (timestamp or _now_ts()) + _DEMO_SUFFIX
+        }
     
-    def get_btc_price(self) -> Optional[Dict]:
+    def get_btc_price(self, use_store: bool = True,
+                      pending: Optional[List[Tuple[str, str, int]]] = None) -> Optional[Dict]:
         """获取BTC价格 - 尝试多个API源"""
-        # 方法1: 尝试Binance API (通常更稳定)
-        try:
-            url = "https://api.binance.com/api/v3/ticker/price?symbol=BTCUSDT"
-            response = self.session.get(url, timeout=8)
-            response.raise_for_status()
-            data = response.json()
-            
-            price = float(data['price'])
-            
-            return {
-                'symbol': 'BTC-USD',
-                'price': price,
-                'currency': 'USD',
-                'name': 'Bitcoin',
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
-        except Exception as e:
-            print(f"Binance API失败: {e}")
+        cached = self._get_cached_quote('BTC-USD', 'btc', use_store)
+        if cached:
+            return cached
         
-        # 方法2: 尝试CoinGecko API
-        try:
-            url = "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd"
-            response = self.session.get(url, timeout=8)
-            response.raise_for_status()
-            data = response.json()
-            
-            price = float(data['bitcoin']['usd'])
-            
-            return {
-                'symbol': 'BTC-USD',
-                'price': price,
-                'currency': 'USD',
-                'name': 'Bitcoin',
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
-        except Exception as e:
-            print(f"CoinGecko API失败: {e}")
-        
-        # 方法3: 尝试Yahoo Finance (BTC-USD)
-        try:
-            url = "https://query1.finance.yahoo.com/v8/finance/chart/BTC-USD"
-            response = self.session.get(url, timeout=8)
-            response.raise_for_status()
-            data = response.json()
-            
-            if 'chart' in data and 'result' in data['chart'] and data['chart']['result']:
-                result = data['chart']['result'][0]
-                if 'meta' in result and 'regularMarketPrice' in result['meta']:
-                    price = float(result['meta']['regularMarketPrice'])
-                    
-                    return {
-                        'symbol': 'BTC-USD',
-                        'price': price,
-                        'currency': 'USD',
-                        'name': 'Bitcoin',
-                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    }
-        except Exception as e:
-            print(f"Yahoo Finance BTC API失败: {e}")
+        for name, url, timeout, parse in _BTC_SOURCES:
+            try:
+                price = parse(self._get_json(url, timeout))
+                if price is not None:
+                    return self._cache_quote('BTC-USD', 'btc', self._build_btc_price(price), pending)
+            except Exception as e:
+                print(f"{name} API失败: {e}")
         
+        return self._get_demo_btc_price()
+    
+    def _build_btc_price(self, price: float, timestamp: Optional[str] = None) -> Dict:
+        """构建BTC价格数据"""
+        return {
+            'symbol': 'BTC-USD',
+            'price': price,
+            'currency': 'USD',
+            'name': 'Bitcoin',
+            'timestamp': timestamp or _now_ts()
+        }
+    
+    def _get_demo_btc_price(self, timestamp: Optional[str] = None) -> Dict:
+        """BTC演示数据回退方案"""
         # 所有API都失败，返回演示数据
         print(f"获取BTC数据失败，使用演示数据")
         return {
@@ -179,16 +368,184 @@ class DataFetcher:
             'price': 64250.0,
             'currency': 'USD',
             'name': 'Bitcoin',
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S') + ' (演示数据)'
+            'timestamp': (timestamp or _now_ts()) + _DEMO_SUFFIX
         }
     
-    def get_price(self, symbol: str) -> Optional[Dict]:
-        """统一的价格获取接口"""
+    def get_price(self, symbol: str, use_store: bool = True,
+                  pending: Optional[List[Tuple[str, str, int]]] = None) -> Optional[Dict]:
+        """
+        统一的价格获取接口
+        
+        批量获取时 use_store=False（持久化缓存已由批量预读处理），
+        新行情的持久化行收集到 pending 中统一写入
+        """
         if symbol.upper().startswith('BTC'):
-            return self.get_btc_price()
+            return self.get_btc_price(use_store, pending)
         else:
-            return self.get_stock_price(symbol)
-
+            return self.get_stock_price(symbol, use_store, pending)
+    
+    def get_prices(self, symbols: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        批量获取价格 - 去重后并发请求所有标的
+        
+        Args:
+            symbols: 股票/币种代码列表
+            
+        Returns:
+            {symbol: 价格数据} 字典
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        
+        try:
+            import aiohttp  # noqa: F401
+        except ImportError:
+            # 未安装aiohttp时退化为线程池并发同步获取（Worker环境中顺序获取）
+            self._preload_cached_quotes(symbols)
+            return self._get_prices_threaded(symbols)
+        
+        return asyncio.run(self.aget_prices(symbols))
+    
+    def _get_prices_threaded(self, symbols: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        线程池并发同步获取（已去重的标的），不支持线程的环境退化为顺序获取
+        
+        调用前已批量预读持久化缓存，各标的只查内存缓存；新行情在全部获取后一次写入持久化缓存
+        """
+        if not symbols:
+            return {}
+        
+        pending: List[Tuple[str, str, int]] = []
+        fetch = functools.partial(self.get_price, use_store=False, pending=pending)
+        results = None
+        if _THREADS_AVAILABLE:
+            try:
+                with ThreadPoolExecutor(max_workers=min(_MAX_FETCH_WORKERS, len(symbols))) as executor:
+                    results = dict(zip(symbols, executor.map(fetch, symbols)))
+            except RuntimeError as e:
+                # 无法创建线程（如解释器关闭中），退化为顺序获取
+                print(f"线程池不可用，改为顺序获取: {e}")
+        
+        if results is None:
+            results = {symbol: fetch(symbol) for symbol in symbols}
+        
+        self._persist_quotes(pending)
+        return results
+    
+    async def __aenter__(self) -> 'DataFetcher':
+        """进入异步上下文 - 创建在多次批量获取之间复用的aiohttp会话"""
+        if self._asession is None:
+            try:
+                self._asession = self._new_async_session()
+            except ImportError:
+                # 未安装aiohttp时 aget_prices 回退到线程池
+                pass
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """退出异步上下文 - 关闭复用的aiohttp会话"""
+        session, self._asession = self._asession, None
+        if session is not None:
+            await session.close()
+    
+    def _new_async_session(self):
+        """创建带连接池的aiohttp会话"""
+        import aiohttp
+        
+        connector = aiohttp.TCPConnector(**self._connector_options)
+        return aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=10))
+    
+    async def aget_price(self, symbol: str) -> Optional[Dict]:
+        """异步获取单个标的价格 - get_price 的异步版本，可在已有事件循环中与其他任务并发"""
+        return (await self.aget_prices([symbol]))[symbol]
+    
+    async def aget_prices(self, symbols: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        异步批量获取价格 - 共享一个aiohttp会话，所有请求并发执行
+        
+        在 async with DataFetcher() 内调用时复用上下文会话，否则为本批次临时创建会话
+        """
+        symbols = list(dict.fromkeys(symbols))
+        # 同一批次共用一个时间戳
+        timestamp = _now_ts()
+        # 持久化缓存一次批量读取，之后各标的只查内存缓存（存储读写放到工作线程，不阻塞事件循环）
+        if self._store is not None:
+            await asyncio.to_thread(self._preload_cached_quotes, symbols)
+        
+        pending: List[Tuple[str, str, int]] = []
+        if self._asession is not None:
+            results = await self._agather(self._asession, symbols, timestamp, pending)
+        else:
+            try:
+                session = self._new_async_session()
+            except ImportError:
+                # 未安装aiohttp时在工作线程中并发同步获取，不阻塞事件循环
+                return await asyncio.to_thread(self._get_prices_threaded, symbols)
+            
+            async with session:
+                results = await self._agather(session, symbols, timestamp, pending)
+        
+        # 本批次新获取的行情一次写入持久化缓存
+        if pending:
+            await asyncio.to_thread(self._persist_quotes, pending)
+        return dict(zip(symbols, results))
+    
+    async def _agather(self, session, symbols: List[str], timestamp: str,
+                       pending: List[Tuple[str, str, int]]) -> List[Optional[Dict]]:
+        """在给定会话上并发获取所有标的，新行情的持久化行收集到 pending"""
+        return await asyncio.gather(*(self._aget_price(session, s, timestamp, False, pending)
+                                      for s in symbols))
+    
+    async def _fetch_json(self, session, url: str, timeout: float) -> Any:
+        """异步GET并解析JSON - 与同步路径共享条件请求缓存"""
+        import aiohttp
+        
+        cached = self._http_cache.get(url)
+        async with session.get(url, headers=self._request_headers(cached),
+                               timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            if response.status == 304:
+                return self._not_modified_data(url, cached)
+            
+            response.raise_for_status()
+            data = _loads(await response.read())
+            self._store_http_cache(url, response.headers, data)
+            return data
+    
+    async def _aget_price(self, session, symbol: str, timestamp: str, use_store: bool = True,
+                          pending: Optional[List[Tuple[str, str, int]]] = None) -> Optional[Dict]:
+        """异步获取单个标的价格（use_store=False: 持久化缓存已由批量预读处理）"""
+        if symbol.upper().startswith('BTC'):
+            cached = self._get_cached_quote('BTC-USD', 'btc', use_store)
+            if cached:
+                return cached
+            
+            for name, url, timeout, parse in _BTC_SOURCES:
+                try:
+                    price = parse(await self._fetch_json(session, url, timeout))
+                    if price is not None:
+                        return self._cache_quote('BTC-USD', 'btc', self._build_btc_price(price, timestamp),
+                                                 pending)
+                except Exception as e:
+                    print(f"{name} API失败: {e}")
+            
+            return self._get_demo_btc_price(timestamp)
+        
+        cached = self._get_cached_quote(symbol, 'quote', use_store)
+        if cached:
+            return cached
+        
+        for base_url in _YAHOO_CHART_URLS:
+            try:
+                url = base_url + symbol + _YAHOO_CHART_PARAMS
+                result = self._build_stock_price(symbol, await self._fetch_json(session, url, 10), timestamp)
+                if result:
+                    return self._cache_quote(symbol, 'quote', result, pending)
+            except Exception as e:
+                print(f"Yahoo Finance API失败 ({base_url}): {e}")
+        
+        print(f"获取股票 {symbol} 真实数据失败，使用演示数据")
+        return self._get_demo_price(symbol, timestamp)
 
 if __name__ == "__main__":
     # 测试代码
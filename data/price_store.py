@@ -0,0 +1,70 @@
+"""
+共享价格快照 - 后台线程定期刷新活跃标的价格，读取方直接查内存
+"""
+
+import threading
+from typing import Callable, Dict, List, Optional
+
+from .fetcher import DataFetcher
+
+
+class PriceStore:
+    """价格快照: symbol -> 价格数据，由后台线程整体替换"""
+    
+    __slots__ = ('fetcher', 'symbols_provider', 'refresh_interval',
+                 '_prices', '_thread', '_stop_event')
+    
+    def __init__(self, fetcher: DataFetcher, symbols_provider: Callable[[], List[str]],
+                 refresh_interval: float = 30.0) -> None:
+        """
+        Args:
+            fetcher: 数据获取器
+            symbols_provider: 返回需要刷新的标的列表（如活跃策略的标的）
+            refresh_interval: 刷新间隔（秒）
+        """
+        self.fetcher = fetcher
+        self.symbols_provider = symbols_provider
+        self.refresh_interval = refresh_interval
+        self._prices: Dict[str, Dict] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+    
+    def get(self, symbol: str) -> Optional[Dict]:
+        """读取标的的最新快照价格"""
+        return self._prices.get(symbol)
+    
+    def get_many(self, symbols: List[str]) -> Dict[str, Dict]:
+        """读取多个标的的快照价格（只返回已有快照的标的）"""
+        prices = self._prices
+        return {symbol: prices[symbol] for symbol in symbols if symbol in prices}
+    
+    def refresh(self) -> Dict[str, Dict]:
+        """立即刷新所有标的，并以新字典整体替换快照（读取方无需加锁）"""
+        prices = self.fetcher.get_prices(self.symbols_provider())
+        self._prices = {symbol: data for symbol, data in prices.items() if data}
+        return self._prices
+    
+    def start(self) -> None:
+        """启动后台刷新线程"""
+        if self._thread is not None:
+            return
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='price-store-refresher', daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """停止后台刷新线程"""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop_event.set()
+            thread.join()
+    
+    def _run(self) -> None:
+        """刷新循环: 启动后立即刷新一次，之后按间隔刷新"""
+        while not self._stop_event.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"刷新价格快照失败: {e}")
+            self._stop_event.wait(self.refresh_interval)
@@ -2,8 +2,9 @@
 数据存储模块 - 使用适配器模式支持多种数据库
 """
 
+import atexit
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 from .database_adapter import DatabaseAdapter, SQLiteAdapter
 
@@ -24,6 +25,13 @@ class Database:
             
         self.adapter.connect()
         self.init_database()
+        # 进程退出时释放持久连接
+        atexit.register(self.close)
+    
+    def close(self):
+        """关闭数据库连接"""
+        atexit.unregister(self.close)
+        self.adapter.close()
     
     def init_database(self):
         """初始化数据库表"""
@@ -34,6 +42,10 @@ class Database:
         """添加监控策略"""
         return self.adapter.add_strategy(name, symbol, condition_type, target_price, action)
     
+    def add_strategies(self, strategies: List[Tuple[str, str, str, float, str]]) -> List[int]:
+        """批量添加监控策略 (name, symbol, condition_type, target_price, action)"""
+        return self.adapter.add_strategies(strategies)
+    
     def get_active_strategies(self) -> List[Dict]:
         """获取所有活跃的监控策略"""
         return self.adapter.get_active_strategies()
@@ -42,14 +54,26 @@ class Database:
         """标记策略为已触发"""
         self.adapter.trigger_strategy(strategy_id)
     
+    def batch_trigger_and_notify(self, triggers: List[Tuple[int, str]]):
+        """批量标记策略已触发并记录通知 (strategy_id, message)，单次提交"""
+        self.adapter.batch_trigger_and_notify(triggers)
+    
     def save_price(self, price_data: Dict):
         """保存价格数据"""
         self.adapter.save_price(price_data)
     
+    def save_prices_bulk(self, prices: List[Dict]):
+        """批量保存价格数据"""
+        self.adapter.save_prices_bulk(prices)
+    
     def add_notification(self, strategy_id: int, message: str):
         """记录通知"""
         self.adapter.add_notification(strategy_id, message)
     
+    def add_notifications_bulk(self, notifications: List[Tuple[int, str]]):
+        """批量记录通知 (strategy_id, message)"""
+        self.adapter.add_notifications_bulk(notifications)
+    
     def get_strategies_summary(self) -> Dict:
         """获取策略统计信息"""
         return self.adapter.get_strategies_summary()
@@ -58,6 +82,18 @@ class Database:
         """获取最近的通知记录"""
         return self.adapter.get_recent_notifications(limit)
     
+    def get_cached_price(self, key: str, now: int) -> Optional[Tuple[str, int]]:
+        """读取未过期的价格缓存 (payload, expires_at)"""
+        return self.adapter.get_cached_price(key, now)
+    
+    def get_cached_prices(self, keys: List[str], now: int) -> Dict[str, Tuple[str, int]]:
+        """批量读取未过期的价格缓存 {key: (payload, expires_at)}"""
+        return self.adapter.get_cached_prices(keys, now)
+    
+    def set_cached_prices(self, rows: List[Tuple[str, str, int]]) -> None:
+        """批量写入价格缓存 [(key, payload, expires_at), ...]"""
+        self.adapter.set_cached_prices(rows)
+    
     def get_latest_price(self, symbol: str) -> Optional[Dict]:
         """获取最新价格 - 兼容性方法"""
         # 这个方法在当前架构中不常用，但保留用于向后兼容
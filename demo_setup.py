@@ -11,7 +11,7 @@ def setup_demo_data():
     print("🎯 创建演示数据...")
     
     # 创建策略管理器
-    manager = StrategyManager("stock_monitor.db")
+    manager = StrategyManager(db_path="stock_monitor.db")
     
     # 添加演示策略
     demo_strategies = [
@@ -24,13 +24,13 @@ def setup_demo_data():
     
     print(f"添加 {len(demo_strategies)} 个演示策略:")
     
-    for name, symbol, condition, price, action in demo_strategies:
-        try:
-            strategy_id = manager.create_strategy(name, symbol, condition, price, action)
+    try:
+        manager.create_strategies(demo_strategies)
+        for name, symbol, condition, price, action in demo_strategies:
             condition_text = "低于" if condition == "below" else "高于"
             print(f"  ✅ {name}: {symbol} 价格{condition_text} {price} 时{action}")
-        except Exception as e:
-            print(f"  ❌ 创建策略失败: {e}")
+    except Exception as e:
+        print(f"  ❌ 创建策略失败: {e}")
     
     # 手动执行一次检查来生成一些通知数据
     print("\n🔍 执行策略检查...")
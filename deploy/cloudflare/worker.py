@@ -3,11 +3,18 @@ Cloudflare Workers Python 后端
 将Flask API转换为Workers兼容的处理器
 """
 
-import json
+import functools
+import hashlib
 import sys
 import os
 from typing import Dict, Any
-from urllib.parse import parse_qs
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import orjson
+except ImportError:  # 未安装orjson时回退到标准库json
+    orjson = None  # type: ignore[assignment]
+    import json
 
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
@@ -17,6 +24,59 @@ from config.manager import ConfigManager
 from data.database_adapter import CloudflareD1Adapter
 
 
+def _dumps(obj: Any) -> str:
+    """序列化响应体 - 优先使用orjson"""
+    if orjson:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj)
+
+
+# 响应头（所有响应共享，只读使用）
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+_JSON_CORS_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*'
+}
+
+# API信息响应体内容固定，导入时序列化一次
+_STATIC_BODY = _dumps({
+    'message': 'Stock Monitor API',
+    'version': '1.0.0',
+    'endpoints': [
+        '/api/stats',
+        '/api/strategies', 
+        '/api/notifications',
+        '/api/trigger-check'
+    ]
+})
+
+
+# 可缓存GET接口的客户端缓存时间
+_CACHE_CONTROL = 'max-age=5'
+
+
+def _with_etag(request: Dict[str, Any], response: Dict[str, Any]) -> Dict[str, Any]:
+    """为200响应附加弱ETag，客户端If-None-Match命中时返回304"""
+    if response['status'] != 200:
+        return response
+    
+    digest = hashlib.blake2b(response['body'].encode('utf-8'), digest_size=8).hexdigest()
+    etag = f'W/"{digest}"'
+    headers = request.get('headers') or {}
+    if headers.get('if-none-match', headers.get('If-None-Match')) == etag:
+        return {
+            'status': 304,
+            'headers': {'ETag': etag, 'Access-Control-Allow-Origin': '*'},
+            'body': ''
+        }
+    
+    return {
+        'status': 200,
+        'headers': {**response['headers'], 'ETag': etag, 'Cache-Control': _CACHE_CONTROL},
+        'body': response['body']
+    }
+
+
 class WorkerApp:
     """Cloudflare Workers应用类"""
     
@@ -31,6 +91,14 @@ class WorkerApp:
         
         # 创建策略管理器
         self.strategy_manager = StrategyManager(config=self.config_manager.get_all())
+        
+        # 路由表: 路径 -> (HTTP方法, 处理函数, 是否启用ETag)，方法为None表示不限方法
+        self._routes = {
+            '/api/stats': (None, self.handle_stats, True),
+            '/api/strategies': (None, self.handle_strategies, True),
+            '/api/notifications': (None, self.handle_notifications, False),
+            '/api/trigger-check': ('POST', self.handle_trigger_check, False),
+        }
     
     def handle_request(self, request: Dict[str, Any], env: Dict[str, Any]) -> Dict[str, Any]:
         """处理HTTP请求"""
@@ -38,52 +106,44 @@ class WorkerApp:
             method = request.get('method', 'GET')
             url = request.get('url', '')
             
-            # 解析路径
-            if '/api/stats' in url:
-                return self.handle_stats()
-            elif '/api/strategies' in url:
-                return self.handle_strategies()
-            elif '/api/notifications' in url:
-                return self.handle_notifications()
-            elif '/api/trigger-check' in url and method == 'POST':
-                return self.handle_trigger_check()
-            else:
-                return self.handle_static()
+            # 解析路径并查路由表
+            route = self._routes.get(urlparse(url).path)
+            if route and route[0] in (None, method):
+                _, handler, use_etag = route
+                response = handler()
+                return _with_etag(request, response) if use_etag else response
+            return self.handle_static()
         
         except Exception as e:
             return {
                 'status': 500,
-                'headers': {'Content-Type': 'application/json'},
-                'body': json.dumps({'error': str(e)})
+                'headers': _JSON_HEADERS,
+                'body': _dumps({'error': str(e)})
             }
     
     def handle_stats(self) -> Dict[str, Any]:
         """处理统计信息API"""
         try:
-            status = self.strategy_manager.get_strategy_status()
-            symbols_count = len(status['by_symbol'])
+            summary = self.strategy_manager.get_summary()
             
             stats = {
-                'total': status['summary']['total'],
-                'active': status['summary']['active'],
-                'triggered': status['summary']['triggered'],
-                'symbols': symbols_count,
+                'total': summary['total'],
+                'active': summary['active'],
+                'triggered': summary['triggered'],
+                'symbols': summary['symbols'],
                 'last_updated': '2025-08-27T21:41:14.173089'  # 固定时间戳，实际应用中用datetime.now()
             }
             
             return {
                 'status': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps(stats)
+                'headers': _JSON_CORS_HEADERS,
+                'body': _dumps(stats)
             }
         except Exception as e:
             return {
                 'status': 500,
-                'headers': {'Content-Type': 'application/json'},
-                'body': json.dumps({'error': str(e)})
+                'headers': _JSON_HEADERS,
+                'body': _dumps({'error': str(e)})
             }
     
     def handle_strategies(self) -> Dict[str, Any]:
@@ -93,17 +153,14 @@ class WorkerApp:
             
             return {
                 'status': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps(strategies)
+                'headers': _JSON_CORS_HEADERS,
+                'body': _dumps(strategies)
             }
         except Exception as e:
             return {
                 'status': 500,
-                'headers': {'Content-Type': 'application/json'},
-                'body': json.dumps({'error': str(e)})
+                'headers': _JSON_HEADERS,
+                'body': _dumps({'error': str(e)})
             }
     
     def handle_notifications(self) -> Dict[str, Any]:
@@ -113,17 +170,14 @@ class WorkerApp:
             
             return {
                 'status': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps(notifications)
+                'headers': _JSON_CORS_HEADERS,
+                'body': _dumps(notifications)
             }
         except Exception as e:
             return {
                 'status': 500,
-                'headers': {'Content-Type': 'application/json'},
-                'body': json.dumps({'error': str(e)})
+                'headers': _JSON_HEADERS,
+                'body': _dumps({'error': str(e)})
             }
     
     def handle_trigger_check(self) -> Dict[str, Any]:
@@ -140,17 +194,14 @@ class WorkerApp:
             
             return {
                 'status': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps(response_data)
+                'headers': _JSON_CORS_HEADERS,
+                'body': _dumps(response_data)
             }
         except Exception as e:
             return {
                 'status': 500,
-                'headers': {'Content-Type': 'application/json'},
-                'body': json.dumps({'error': str(e)})
+                'headers': _JSON_HEADERS,
+                'body': _dumps({'error': str(e)})
             }
     
     def handle_static(self) -> Dict[str, Any]:
@@ -159,33 +210,26 @@ class WorkerApp:
         # 这里返回一个简单的重定向或者API信息
         return {
             'status': 200,
-            'headers': {'Content-Type': 'application/json'},
-            'body': json.dumps({
-                'message': 'Stock Monitor API',
-                'version': '1.0.0',
-                'endpoints': [
-                    '/api/stats',
-                    '/api/strategies', 
-                    '/api/notifications',
-                    '/api/trigger-check'
-                ]
-            })
+            'headers': _JSON_HEADERS,
+            'body': _STATIC_BODY
         }
 
 
 # Cloudflare Workers 入口点
-app = WorkerApp()
+@functools.cache
+def _get_app() -> WorkerApp:
+    """首次请求时创建应用实例，之后fetch与scheduled共用同一实例"""
+    return WorkerApp()
 
 def fetch(request, env):
     """Cloudflare Workers fetch处理器"""
-    return app.handle_request(request, env)
+    return _get_app().handle_request(request, env)
 
 def scheduled(event, env, ctx):
     """Cloudflare Workers cron处理器"""
     try:
-        # 定时检查策略触发
-        app = WorkerApp()
-        triggered = app.strategy_manager.check_strategy_triggers()
+        # 定时检查策略触发（复用共享应用实例）
+        triggered = _get_app().strategy_manager.check_strategy_triggers()
         
         if triggered:
             print(f"定时检查触发了 {len(triggered)} 个策略")
@@ -32,9 +32,18 @@ CREATE TABLE IF NOT EXISTS notifications (
     FOREIGN KEY (strategy_id) REFERENCES strategies (id)
 );
 
+-- 价格缓存表（跨进程/重启复用行情数据）
+CREATE TABLE IF NOT EXISTS price_cache (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    expires_at INTEGER NOT NULL
+);
+
 -- 创建索引以提升查询性能
 CREATE INDEX IF NOT EXISTS idx_strategies_status ON strategies(status);
 CREATE INDEX IF NOT EXISTS idx_strategies_symbol ON strategies(symbol);
 CREATE INDEX IF NOT EXISTS idx_price_data_symbol ON price_data(symbol);
 CREATE INDEX IF NOT EXISTS idx_price_data_timestamp ON price_data(timestamp);
-CREATE INDEX IF NOT EXISTS idx_notifications_sent_at ON notifications(sent_at);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_notifications_sent_at ON notifications(sent_at);
+CREATE INDEX IF NOT EXISTS idx_strategies_status_created ON strategies(status, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_price_data_symbol_timestamp ON price_data(symbol, timestamp DESC);
\ No newline at end of file
@@ -7,13 +7,14 @@
 import argparse
 import json
 from pathlib import Path
-from typing import Dict
+from typing import TYPE_CHECKING, Dict
 
-from strategy.manager import StrategyManager
-from monitor.engine import MonitorEngine
-from notification.email_service import EmailService
 from config.manager import ConfigManager, create_default_config
 
+# 策略/监控/邮件模块在各子命令分支内按需导入，查看类命令无需加载调度、SMTP等依赖
+if TYPE_CHECKING:
+    from strategy.manager import StrategyManager
+
 
 def load_config(config_path: str = "config.json") -> ConfigManager:
     """加载配置 - 使用新的配置管理器"""
@@ -55,6 +56,8 @@ def setup_email_config():
     password = input("邮箱密码/授权码: ").strip()
     recipient_email = input("接收通知的邮箱: ").strip()
     
+    from notification.email_service import EmailService
+    
     # 测试邮件连接
     print("\n🔍 测试邮件连接...")
     email_service = EmailService()
@@ -77,7 +80,7 @@ def setup_email_config():
         return {'enabled': False}
 
 
-def add_strategy_interactive(manager: StrategyManager):
+def add_strategy_interactive(manager: 'StrategyManager'):
     """交互式添加监控策略"""
     print("\n📈 添加监控策略")
     
@@ -122,7 +125,7 @@ def add_strategy_interactive(manager: StrategyManager):
         print(f"❌ 策略创建失败: {e}")
 
 
-def list_strategies(manager: StrategyManager):
+def list_strategies(manager: 'StrategyManager'):
     """列出所有策略"""
     print("\n📊 当前监控策略")
     
@@ -175,30 +178,30 @@ def main():
         print("✅ 配置已保存")
         return
     
-    # 创建管理器 - 使用新的配置系统
-    manager = StrategyManager(config=config)
-    
-    # 添加策略
-    if args.add_strategy:
-        add_strategy_interactive(manager)
-        return
-    
-    # 列出策略
-    if args.list_strategies:
-        list_strategies(manager)
-        return
-    
-    # 创建监控引擎
-    engine = MonitorEngine(config)
-    
-    # 手动执行检查
-    if args.run_once:
-        engine.run_once()
+    # 策略命令只需要策略管理器 - 使用新的配置系统
+    if args.add_strategy or args.list_strategies:
+        from strategy.manager import StrategyManager
+        manager = StrategyManager(config=config)
+        
+        if args.add_strategy:
+            # 添加策略
+            add_strategy_interactive(manager)
+        else:
+            # 列出策略
+            list_strategies(manager)
         return
     
-    # 启动监控系统
-    if args.start:
-        engine.start_monitoring()
+    # 监控命令才创建监控引擎
+    if args.run_once or args.start:
+        from monitor.engine import MonitorEngine
+        engine = MonitorEngine(config)
+        
+        if args.run_once:
+            # 手动执行检查
+            engine.run_once()
+        else:
+            # 启动监控系统
+            engine.start_monitoring()
         return
     
     # 启动Web管理界面
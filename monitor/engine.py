@@ -2,14 +2,41 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import schedule
-import time
+import asyncio
 from datetime import datetime
 from typing import Dict, Optional
 from strategy.manager import StrategyManager
 from notification.email_service import EmailService
 
 
+# 默认检查间隔（秒），可通过 monitoring.check_interval 配置
+_DEFAULT_CHECK_INTERVAL = 300
+# 旧版配置 test_mode=True 时的检查间隔（原来每分钟额外检查一次）
+_TEST_MODE_CHECK_INTERVAL = 60
+
+
+def _check_interval_from_config(config: Dict) -> int:
+    """读取检查间隔（秒），兼容旧版顶层配置 schedule_time / test_mode 并给出迁移提示"""
+    interval = config.get('monitoring', {}).get('check_interval', _DEFAULT_CHECK_INTERVAL)
+    
+    if config.get('test_mode', False):
+        interval = _TEST_MODE_CHECK_INTERVAL
+        print(f"⚠️  配置项 test_mode 已弃用，按每 {interval} 秒检查一次；"
+              f"请改用 monitoring.check_interval")
+    if 'schedule_time' in config:
+        print(f"⚠️  配置项 schedule_time 已不再生效：不再每天定时检查，"
+              f"改为每 {interval} 秒检查一次（monitoring.check_interval）")
+    return int(interval)
+
+
+def _next_run_time(scheduled: float, now: float, interval: float) -> float:
+    """
+    计算下一次检查时间: 按固定节拍推进，检查耗时不会累积漂移；
+    检查耗时超过间隔而落后时从当前时间重新计时（立即补跑一次，不连续补跑错过的多次）
+    """
+    return max(scheduled + interval, now)
+
+
 class MonitorEngine:
     def __init__(self, config: Dict):
         """
@@ -19,11 +46,11 @@ class MonitorEngine:
             config: 配置字典，包含数据库路径、邮件配置等
         """
         self.config = config
-        self.strategy_manager = StrategyManager(config.get('db_path', 'stock_monitor.db'))
+        self.strategy_manager = StrategyManager(config=config)
         
         # 初始化邮件服务
         email_config = config.get('email', {})
-        self.email_service = EmailService()
+        self.email_service = EmailService(max_per_minute=email_config.get('max_per_minute', 30))
         
         if email_config.get('enabled', False):
             self.email_service.configure(
@@ -33,41 +60,40 @@ class MonitorEngine:
             )
         
         self.recipient_email = email_config.get('recipient_email', '')
+        # 单轮触发数超过该值时改发一封汇总邮件
+        self.digest_threshold = email_config.get('digest_threshold', 3)
+        # 两次监控检查之间的间隔（秒）
+        self.check_interval = _check_interval_from_config(config)
         self.is_running = False
+        # 监控循环所在的事件循环及停止事件，stop_monitoring 通过它们立即唤醒循环
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
         
     def run_check_cycle(self):
         """执行一次完整的监控检查周期"""
-        print(f"\n🔍 开始监控检查 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        asyncio.run(self.arun_check_cycle())
+    
+    async def arun_check_cycle(self):
+        """执行一次完整的监控检查周期（异步: 价格并发获取，数据库与SMTP调用放到工作线程）"""
+        print(f"\n🔍 开始监控检查 - {datetime.now().isoformat(sep=' ', timespec='seconds')}")
         
         try:
-            # 获取策略统计
-            status = self.strategy_manager.get_strategy_status()
-            print(f"📊 当前活跃策略: {status['summary']['active']} 个")
+            # 每轮只查询一次活跃策略，统计与触发检查共用
+            active_strategies = await asyncio.to_thread(self.strategy_manager.get_all_strategies)
+            print(f"📊 当前活跃策略: {len(active_strategies)} 个")
             
-            if status['summary']['active'] == 0:
+            if not active_strategies:
                 print("⏸️  没有活跃策略，跳过本次检查")
                 return
             
             # 检查策略触发
-            triggered_strategies = self.strategy_manager.check_strategy_triggers()
+            triggered_strategies = await self.strategy_manager.acheck_strategy_triggers(active_strategies)
             
             if triggered_strategies:
                 print(f"🚨 发现 {len(triggered_strategies)} 个策略被触发!")
                 
-                # 发送邮件通知
-                if self.email_service.is_configured and self.recipient_email:
-                    success_count = self.email_service.send_trigger_notifications(
-                        self.recipient_email, triggered_strategies
-                    )
-                    print(f"📧 成功发送 {success_count}/{len(triggered_strategies)} 个邮件通知")
-                else:
-                    print("⚠️  邮件服务未配置，跳过邮件通知")
-                
-                # 记录通知到数据库
-                for trigger_info in triggered_strategies:
-                    strategy_id = trigger_info['strategy']['id']
-                    message = self.strategy_manager.format_trigger_message(trigger_info)
-                    self.strategy_manager.db.add_notification(strategy_id, message)
+                # SMTP发送是阻塞调用，放到工作线程执行
+                await asyncio.to_thread(self._send_notifications, triggered_strategies)
                 
             else:
                 print("✅ 当前价格未触发任何策略")
@@ -75,6 +101,23 @@ class MonitorEngine:
         except Exception as e:
             print(f"❌ 监控检查过程中出错: {e}")
     
+    def _send_notifications(self, triggered_strategies):
+        """发送邮件通知，触发数超过阈值时合并为一封汇总邮件"""
+        if not (self.email_service.is_configured and self.recipient_email):
+            print("⚠️  邮件服务未配置，跳过邮件通知")
+            return
+        
+        if len(triggered_strategies) > self.digest_threshold:
+            if self.email_service.send_digest_notification(
+                self.recipient_email, triggered_strategies
+            ):
+                print(f"📧 已发送汇总邮件（{len(triggered_strategies)} 个策略）")
+        else:
+            success_count = self.email_service.send_trigger_notifications(
+                self.recipient_email, triggered_strategies
+            )
+            print(f"📧 成功发送 {success_count}/{len(triggered_strategies)} 个邮件通知")
+    
     def start_monitoring(self):
         """启动监控系统"""
         print("🚀 股市监控系统启动中...")
@@ -82,32 +125,42 @@ class MonitorEngine:
         # 显示配置信息
         self._show_config_info()
         
-        # 设置定时任务
-        schedule_time = self.config.get('schedule_time', '09:00')
-        schedule.every().day.at(schedule_time).do(self.run_check_cycle)
-        
-        # 也可以设置更频繁的检查（用于测试）
-        if self.config.get('test_mode', False):
-            schedule.every(1).minutes.do(self.run_check_cycle)
-            print("🧪 测试模式：每分钟检查一次")
-        
-        print(f"⏰ 定时任务已设置：每天 {schedule_time} 执行监控")
+        print(f"⏰ 定时任务已设置：每 {self.check_interval} 秒执行一次监控")
         print("🔄 系统运行中，按 Ctrl+C 停止...")
         
         self.is_running = True
         
         try:
-            while self.is_running:
-                schedule.run_pending()
-                time.sleep(1)
+            asyncio.run(self._monitor_loop())
         except KeyboardInterrupt:
             print("\n🛑 收到停止信号，正在关闭系统...")
             self.stop_monitoring()
     
+    async def _monitor_loop(self):
+        """监控主循环: 按固定间隔执行检查，停止事件触发时立即退出"""
+        loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._loop = loop
+        
+        # 整个监控期间复用同一个aiohttp会话（连接池与DNS缓存跨周期保留）
+        async with self.strategy_manager.fetcher:
+            next_run = loop.time() + self.check_interval
+            while self.is_running:
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), max(next_run - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    await self.arun_check_cycle()
+                    next_run = _next_run_time(next_run, loop.time(), self.check_interval)
+        
+        self._loop = None
+    
     def stop_monitoring(self):
-        """停止监控系统"""
+        """停止监控系统（可从其他线程调用）"""
         self.is_running = False
-        schedule.clear()
+        
+        loop, stop_event = self._loop, self._stop_event
+        if loop is not None and stop_event is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(stop_event.set)
         print("✅ 监控系统已停止")
     
     def run_once(self):
@@ -127,7 +180,7 @@ class MonitorEngine:
         else:
             print("   邮件服务: ❌ 未启用")
         
-        print(f"   检查时间: {self.config.get('schedule_time', '09:00')}")
+        print(f"   检查间隔: {self.check_interval} 秒")
         
         # 显示当前策略状态
         status = self.strategy_manager.get_strategy_status()
@@ -144,8 +197,9 @@ def create_default_config() -> Dict:
     """创建默认配置"""
     return {
         'db_path': 'stock_monitor.db',
-        'schedule_time': '09:00',  # 每天9点检查
-        'test_mode': False,
+        'monitoring': {
+            'check_interval': _DEFAULT_CHECK_INTERVAL  # 每5分钟检查一次
+        },
         'email': {
             'enabled': False,
             'sender_email': '',
@@ -163,8 +217,9 @@ if __name__ == "__main__":
     # 创建测试配置
     test_config = {
         'db_path': 'test_monitor.db',
-        'schedule_time': '09:00',
-        'test_mode': True,  # 测试模式
+        'monitoring': {
+            'check_interval': _TEST_MODE_CHECK_INTERVAL  # 测试时每分钟检查一次
+        },
         'email': {
             'enabled': False,  # 测试时不启用邮件
             'sender_email': 'test@example.com',
@@ -1,14 +1,49 @@
-import smtplib
-import ssl
+import threading
+import time
+from collections import deque
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Dict, Optional
+from string import Template
+from typing import TYPE_CHECKING, List, Dict, Optional
 from datetime import datetime
 
+if TYPE_CHECKING:
+    import smtplib
+
+
+# 触发通知邮件正文模板（导入时解析一次，发送时只做变量替换）
+_TRIGGER_EMAIL_TEMPLATE = Template("""\
+$action_text
+
+策略名称: $name
+股票信息: $stock_name ($symbol)
+当前价格: $currency $current_price
+触发条件: 价格$condition_text $currency $target_price
+触发时间: $trigger_time
+
+建议行动: $action
+
+⚠️  请注意风险控制，理性投资！
+
+---
+股市监控系统自动发送
+发送时间: $sent_at""")
+
+# 邮件文案
+_CONDITION_TEXT = {'below': '低于', 'above': '高于'}
+_ACTION_TEXT = {
+    'buy': '🟢 买入提醒',
+    'sell': '🔴 卖出提醒',
+    'notify': '🔔 价格提醒'
+}
+
+# 发送限流的统计窗口（秒）
+_RATE_WINDOW_SECONDS = 60.0
+
 
 class EmailService:
     def __init__(self, smtp_server: str = "smtp.gmail.com", smtp_port: int = 587,
-                 email: str = "", password: str = ""):
+                 email: str = "", password: str = "", max_per_minute: int = 30):
         """
         邮件服务初始化
         
@@ -17,12 +52,18 @@ class EmailService:
             smtp_port: SMTP端口 (通常为587)
             email: 发送者邮箱
             password: 邮箱密码或应用专用密码
+            max_per_minute: 每分钟最多发送的邮件数，超出时等待（避免被服务商限流）
         """
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
         self.email = email
         self.password = password
         self.is_configured = bool(email and password)
+        self.max_per_minute = max_per_minute
+        # 最近一个窗口内的发送时间（单调时钟）
+        self._send_times: deque = deque()
+        # 串行化发送，监控线程与Web请求同时触发时不交错
+        self._send_lock = threading.RLock()
     
     def configure(self, email: str, password: str, smtp_server: str = "smtp.gmail.com"):
         """配置邮件账户"""
@@ -49,22 +90,9 @@ class EmailService:
             return False
         
         try:
-            # 创建邮件内容
-            msg = MIMEMultipart()
-            msg['From'] = self.email
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            # 添加邮件正文
-            msg.attach(MIMEText(message, 'plain', 'utf-8'))
-            
-            # 创建安全连接并发送邮件
-            context = ssl.create_default_context()
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls(context=context)
-                server.login(self.email, self.password)
-                text = msg.as_string()
-                server.sendmail(self.email, to_email, text)
+            with self._send_lock, self._open_connection() as server:
+                self._throttle()
+                server.sendmail(self.email, to_email, self._build_message(to_email, subject, message))
             
             print(f"✅ 邮件发送成功: {subject}")
             return True
@@ -87,22 +115,121 @@ class EmailService:
         if not triggered_strategies:
             return 0
         
+        if not self.is_configured:
+            print("❌ 邮件服务未配置，无法发送邮件")
+            return 0
+        
+        with self._send_lock:
+            return self._send_batch(to_email, triggered_strategies)
+    
+    def _send_batch(self, to_email: str, triggered_strategies: List[Dict]) -> int:
+        """在发送锁内逐封发送触发通知，返回成功数量"""
+        import smtplib
+        
+        # 整批通知共用一个SMTP连接（一次TLS握手 + 一次登录）
+        try:
+            server = self._open_connection()
+        except Exception as e:
+            print(f"❌ 邮件服务连接失败: {e}")
+            return 0
+        
         success_count = 0
+        try:
+            for trigger_info in triggered_strategies:
+                # 逐封构建并立即发送，单封失败不影响其余通知
+                try:
+                    # 每封通知只计入一次限流，断线重发不重复计数
+                    self._throttle()
+                    try:
+                        self._send_one(server, to_email, trigger_info)
+                    except smtplib.SMTPServerDisconnected:
+                        # 服务器中途断开时重连一次
+                        server = self._open_connection()
+                        self._send_one(server, to_email, trigger_info)
+                    success_count += 1
+                except Exception as e:
+                    print(f"❌ 邮件发送失败: {e}")
+        finally:
+            try:
+                server.quit()
+            except smtplib.SMTPException:
+                pass
         
-        for trigger_info in triggered_strategies:
-            strategy = trigger_info['strategy']
-            
-            # 生成邮件主题
-            subject = f"🚨 股市监控提醒 - {strategy['name']}"
-            
-            # 生成邮件内容
-            message = self._format_email_message(trigger_info)
+        return success_count
+    
+    def _send_one(self, server: 'smtplib.SMTP', to_email: str, trigger_info: Dict) -> None:
+        """在已建立的连接上发送一封触发通知（MIME消息只在本次调用内存在；限流由调用方处理）"""
+        # 生成邮件主题
+        subject = f"🚨 股市监控提醒 - {trigger_info['strategy']['name']}"
+        
+        # 生成邮件内容
+        text = self._build_message(to_email, subject, self._format_email_message(trigger_info))
+        
+        server.sendmail(self.email, to_email, text)
+        print(f"✅ 邮件发送成功: {subject}")
+    
+    def send_digest_notification(self, to_email: str, triggered_strategies: List[Dict]) -> bool:
+        """
+        将同一轮触发的所有策略合并为一封汇总邮件发送
+        
+        Args:
+            to_email: 接收者邮箱
+            triggered_strategies: 触发的策略列表
             
-            # 发送邮件
-            if self.send_notification(to_email, subject, message):
-                success_count += 1
+        Returns:
+            发送是否成功
+        """
+        if not triggered_strategies:
+            return False
         
-        return success_count
+        subject = f"🚨 股市监控提醒 - {len(triggered_strategies)} 个策略触发"
+        message = "\n\n---\n\n".join(self._format_email_message(t) for t in triggered_strategies)
+        return self.send_notification(to_email, subject, message)
+    
+    def _throttle(self) -> None:
+        """发送前限流: 最近一分钟内已达上限时，等待最早的一次发送移出窗口"""
+        if self.max_per_minute <= 0:
+            return
+        
+        send_times = self._send_times
+        now = time.monotonic()
+        while send_times and now - send_times[0] >= _RATE_WINDOW_SECONDS:
+            send_times.popleft()
+        
+        if len(send_times) >= self.max_per_minute:
+            wait = _RATE_WINDOW_SECONDS - (now - send_times.popleft())
+            if wait > 0:
+                print(f"⏳ 邮件发送达到每分钟 {self.max_per_minute} 封上限，等待 {wait:.0f} 秒")
+                time.sleep(wait)
+            now = time.monotonic()
+        
+        send_times.append(now)
+    
+    def _open_connection(self) -> 'smtplib.SMTP':
+        """建立已完成STARTTLS和登录的SMTP连接"""
+        # 按需导入: 不发邮件的命令无需加载smtplib/ssl
+        import smtplib
+        import ssl
+        
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        try:
+            server.starttls(context=ssl.create_default_context())
+            server.login(self.email, self.password)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    def _build_message(self, to_email: str, subject: str, message: str) -> str:
+        """构建邮件内容"""
+        msg = MIMEMultipart()
+        msg['From'] = self.email
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        
+        # 添加邮件正文
+        msg.attach(MIMEText(message, 'plain', 'utf-8'))
+        return msg.as_string()
     
     def _format_email_message(self, trigger_info: Dict) -> str:
         """格式化邮件消息"""
@@ -111,32 +238,19 @@ class EmailService:
         currency = trigger_info['currency']
         stock_name = trigger_info['stock_name']
         
-        condition_text = "低于" if strategy['condition_type'] == 'below' else "高于"
-        action_text = {
-            'buy': '🟢 买入提醒',
-            'sell': '🔴 卖出提醒', 
-            'notify': '🔔 价格提醒'
-        }.get(strategy['action'], '🔔 提醒')
-        
-        message = f"""
-{action_text}
-
-策略名称: {strategy['name']}
-股票信息: {stock_name} ({strategy['symbol']})
-当前价格: {currency} {current_price:.2f}
-触发条件: 价格{condition_text} {currency} {strategy['target_price']:.2f}
-触发时间: {trigger_info['trigger_time']}
-
-建议行动: {strategy['action']}
-
-⚠️  请注意风险控制，理性投资！
-
----
-股市监控系统自动发送
-发送时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-        """.strip()
-        
-        return message
+        return _TRIGGER_EMAIL_TEMPLATE.substitute(
+            action_text=_ACTION_TEXT.get(strategy['action'], '🔔 提醒'),
+            name=strategy['name'],
+            stock_name=stock_name,
+            symbol=strategy['symbol'],
+            currency=currency,
+            current_price=f"{current_price:.2f}",
+            condition_text=_CONDITION_TEXT.get(strategy['condition_type'], '高于'),
+            target_price=f"{strategy['target_price']:.2f}",
+            trigger_time=trigger_info['trigger_time'],
+            action=strategy['action'],
+            sent_at=datetime.now().isoformat(sep=' ', timespec='seconds')
+        )
     
     def test_email_connection(self) -> bool:
         """测试邮件连接"""
@@ -145,10 +259,8 @@ class EmailService:
             return False
         
         try:
-            context = ssl.create_default_context()
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls(context=context)
-                server.login(self.email, self.password)
+            with self._open_connection():
+                pass
             
             print("✅ 邮件服务连接测试成功")
             return True
@@ -166,7 +278,7 @@ class EmailService:
 如果您收到这封邮件，说明邮件服务配置成功！
 
 系统信息:
-- 发送时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+- 发送时间: {datetime.now().isoformat(sep=' ', timespec='seconds')}
 - 发送者: {self.email}
 - SMTP服务器: {self.smtp_server}
 
@@ -2,12 +2,42 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from typing import List, Dict, Optional
+import asyncio
+import operator
+from typing import List, Dict, Optional, Tuple
 from data.storage import Database
 from data.fetcher import DataFetcher
+from data.price_store import PriceStore
 from data.database_adapter import create_database_adapter
 
 
+# 触发条件 -> 比较函数 (当前价格, 目标价格)
+_CONDITION_CHECKS = {
+    'below': operator.le,
+    'above': operator.ge
+}
+
+# 触发消息用文案
+_CONDITION_TEXT = {'below': '低于', 'above': '高于'}
+_ACTION_TEXT = {
+    'buy': '买入提醒',
+    'sell': '卖出提醒',
+    'notify': '价格提醒'
+}
+
+
+def _validate_strategy(condition_type: str, target_price: float, action: str) -> None:
+    """验证策略参数"""
+    if condition_type not in _CONDITION_CHECKS:
+        raise ValueError("condition_type 必须是 'below' 或 'above'")
+    
+    if action not in ['buy', 'sell', 'notify']:
+        raise ValueError("action 必须是 'buy', 'sell' 或 'notify'")
+    
+    if target_price <= 0:
+        raise ValueError("target_price 必须大于0")
+
+
 class StrategyManager:
     def __init__(self, config: Dict = None, db_path: str = "stock_monitor.db"):
         """
@@ -24,8 +54,12 @@ class StrategyManager:
         else:
             # 向后兼容，使用SQLite
             self.db = Database(db_path=db_path)
-            
-        self.fetcher = DataFetcher()
+        
+        # 可通过 monitoring.cache_ttl_seconds 统一设置行情缓存有效期
+        cache_ttl = (config or {}).get('monitoring', {}).get('cache_ttl_seconds')
+        self.fetcher = DataFetcher(cache_ttl=cache_ttl, store=self.db)
+        # 共享价格快照（长期运行的Web进程通过 start_price_store 启用）
+        self.price_store: Optional[PriceStore] = None
     
     def create_strategy(self, name: str, symbol: str, condition_type: str, 
                        target_price: float, action: str = 'notify') -> int:
@@ -42,31 +76,60 @@ class StrategyManager:
         Returns:
             策略ID
         """
-        # 验证参数
-        if condition_type not in ['below', 'above']:
-            raise ValueError("condition_type 必须是 'below' 或 'above'")
+        _validate_strategy(condition_type, target_price, action)
+        return self.db.add_strategy(name, symbol, condition_type, target_price, action)
+    
+    def create_strategies(self, strategies: List[Tuple[str, str, str, float, str]]) -> List[int]:
+        """
+        批量创建监控策略（单次写入）
         
-        if action not in ['buy', 'sell', 'notify']:
-            raise ValueError("action 必须是 'buy', 'sell' 或 'notify'")
+        Args:
+            strategies: (name, symbol, condition_type, target_price, action) 列表
         
-        if target_price <= 0:
-            raise ValueError("target_price 必须大于0")
+        Returns:
+            策略ID列表，与输入顺序一致
+        """
+        for _, _, condition_type, target_price, action in strategies:
+            _validate_strategy(condition_type, target_price, action)
         
-        return self.db.add_strategy(name, symbol, condition_type, target_price, action)
+        return self.db.add_strategies(strategies)
     
     def get_all_strategies(self) -> List[Dict]:
         """获取所有活跃策略"""
         return self.db.get_active_strategies()
     
+    def active_symbols(self) -> List[str]:
+        """获取活跃策略涉及的标的（去重）"""
+        return list(dict.fromkeys(s['symbol'] for s in self.db.get_active_strategies()))
+    
+    def start_price_store(self, refresh_interval: float = 30.0) -> PriceStore:
+        """启动后台价格刷新，之后展示用的价格查询优先读取内存快照（触发检查仍实时获取）"""
+        if self.price_store is None:
+            self.price_store = PriceStore(self.fetcher, self.active_symbols, refresh_interval)
+            self.price_store.start()
+        return self.price_store
+    
+    def _current_prices(self, symbols: List[str]) -> Dict[str, Optional[Dict]]:
+        """获取标的当前价格（用于展示）- 优先读取价格快照，快照中没有的标的再请求"""
+        if self.price_store is None:
+            return self.fetcher.get_prices(symbols)
+        
+        prices: Dict[str, Optional[Dict]] = dict(self.price_store.get_many(symbols))
+        missing = [symbol for symbol in symbols if symbol not in prices]
+        if missing:
+            prices.update(self.fetcher.get_prices(missing))
+        return prices
+    
     def get_strategies_with_current_prices(self) -> List[Dict]:
         """获取所有活跃策略及其当前价格"""
         strategies = self.db.get_active_strategies()
         
+        # 每个标的只请求一次，所有标的并发获取
+        prices = self._current_prices([strategy['symbol'] for strategy in strategies])
+        
         for strategy in strategies:
-            symbol = strategy['symbol']
-            
             # 获取当前价格数据
-            current_price_data = self.fetcher.get_price(symbol)
+            current_price_data = prices.get(strategy['symbol'])
             if current_price_data:
                 strategy['current_price'] = current_price_data['price']
                 strategy['currency'] = current_price_data.get('currency', 'USD')
@@ -78,21 +141,54 @@ class StrategyManager:
         
         return strategies
     
-    def check_strategy_triggers(self) -> List[Dict]:
+    def check_strategy_triggers(self, active_strategies: Optional[List[Dict]] = None) -> List[Dict]:
         """
-        检查所有策略是否触发
+        检查所有策略是否触发，触发的策略会被标记并记录通知
+        
+        Args:
+            active_strategies: 本轮已查询的活跃策略，为None时查询数据库
+        
+        Returns:
+            触发的策略列表
+        """
+        if active_strategies is None:
+            active_strategies = self.db.get_active_strategies()
+        
+        # 一次性并发获取所有标的的当前价格（get_prices内部去重）；
+        # 触发判断不读价格快照（快照最多落后一个刷新间隔），只用行情缓存有效期内的价格
+        prices = self.fetcher.get_prices([s['symbol'] for s in active_strategies])
+        return self._apply_triggers(active_strategies, prices)
+    
+    async def acheck_strategy_triggers(self, active_strategies: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        异步检查所有策略是否触发 - 价格在事件循环中并发获取，数据库读写放到工作线程
+        
+        Args:
+            active_strategies: 本轮已查询的活跃策略，为None时查询数据库
         
         Returns:
             触发的策略列表
         """
+        if active_strategies is None:
+            active_strategies = await asyncio.to_thread(self.db.get_active_strategies)
+        # 与 check_strategy_triggers 相同，触发判断不读价格快照
+        prices = await self.fetcher.aget_prices([s['symbol'] for s in active_strategies])
+        return await asyncio.to_thread(self._apply_triggers, active_strategies, prices)
+    
+    def _apply_triggers(self, active_strategies: List[Dict],
+                        prices: Dict[str, Optional[Dict]]) -> List[Dict]:
+        """保存本轮价格，判断触发条件，并标记触发、记录通知"""
         triggered_strategies = []
-        active_strategies = self.db.get_active_strategies()
+        notifications = []
+        
+        # 每个标的的价格只保存一次（单个事务）
+        self.db.save_prices_bulk([p for p in prices.values() if p])
         
         for strategy in active_strategies:
             symbol = strategy['symbol']
             
             # 获取当前价格
-            current_price_data = self.fetcher.get_price(symbol)
+            current_price_data = prices.get(symbol)
             if not current_price_data:
                 print(f"无法获取 {symbol} 的价格数据")
                 continue
@@ -101,20 +197,9 @@ class StrategyManager:
             target_price = strategy['target_price']
             condition_type = strategy['condition_type']
             
-            # 保存价格数据到数据库
-            self.db.save_price(current_price_data)
-            
             # 检查是否触发条件
-            is_triggered = False
-            if condition_type == 'below' and current_price <= target_price:
-                is_triggered = True
-            elif condition_type == 'above' and current_price >= target_price:
-                is_triggered = True
-            
-            if is_triggered:
-                # 标记策略为已触发
-                self.db.trigger_strategy(strategy['id'])
-                
+            check = _CONDITION_CHECKS.get(condition_type)
+            if check is not None and check(current_price, target_price):
                 # 构建触发信息
                 trigger_info = {
                     'strategy': strategy,
@@ -125,11 +210,15 @@ class StrategyManager:
                 }
                 
                 triggered_strategies.append(trigger_info)
+                notifications.append((strategy['id'], self.format_trigger_message(trigger_info)))
                 
                 print(f"🚨 策略触发: {strategy['name']}")
                 print(f"   {trigger_info['stock_name']} 当前价格: {trigger_info['currency']} {current_price}")
                 print(f"   触发条件: {condition_type} {target_price}")
         
+        # 标记触发并记录通知（单次提交）
+        self.db.batch_trigger_and_notify(notifications)
+        
         return triggered_strategies
     
     def format_trigger_message(self, trigger_info: Dict) -> str:
@@ -139,26 +228,24 @@ class StrategyManager:
         currency = trigger_info['currency']
         stock_name = trigger_info['stock_name']
         
-        condition_text = "低于" if strategy['condition_type'] == 'below' else "高于"
-        action_text = {
-            'buy': '买入提醒',
-            'sell': '卖出提醒', 
-            'notify': '价格提醒'
-        }.get(strategy['action'], '提醒')
+        condition_text = _CONDITION_TEXT.get(strategy['condition_type'], '高于')
+        action_text = _ACTION_TEXT.get(strategy['action'], '提醒')
         
-        message = f"""
-🚨 股市监控提醒 - {action_text}
-
-策略名称: {strategy['name']}
-股票信息: {stock_name} ({strategy['symbol']})
-当前价格: {currency} {current_price:.2f}
-触发条件: 价格{condition_text} {currency} {strategy['target_price']:.2f}
-触发时间: {trigger_info['trigger_time']}
-
-请及时关注市场变化！
-        """.strip()
-        
-        return message
+        return "\n".join((
+            f"🚨 股市监控提醒 - {action_text}",
+            "",
+            f"策略名称: {strategy['name']}",
+            f"股票信息: {stock_name} ({strategy['symbol']})",
+            f"当前价格: {currency} {current_price:.2f}",
+            f"触发条件: 价格{condition_text} {currency} {strategy['target_price']:.2f}",
+            f"触发时间: {trigger_info['trigger_time']}",
+            "",
+            "请及时关注市场变化！"
+        ))
+    
+    def get_summary(self) -> Dict:
+        """获取策略统计（单次聚合查询，不加载策略列表）: total, active, triggered, symbols"""
+        return self.db.get_strategies_summary()
     
     def get_strategy_status(self) -> Dict:
         """获取策略状态统计"""
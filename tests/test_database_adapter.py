@@ -0,0 +1,119 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from data.database_adapter import CloudflareD1Adapter, SQLiteAdapter
+
+
+class SQLiteBatchWriteTest(unittest.TestCase):
+    """SQLite 批量写入: 价格、触发+通知、价格缓存"""
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.adapter = SQLiteAdapter(os.path.join(self._tmpdir.name, 'stock_monitor.db'))
+        self.adapter.connect()
+        self.adapter.init_tables()
+
+    def tearDown(self):
+        self.adapter.close()
+        self._tmpdir.cleanup()
+
+    def _query(self, sql):
+        return self.adapter._get_connection().execute(sql).fetchall()
+
+    def test_save_prices_bulk_writes_one_row_per_price(self):
+        self.adapter.save_prices_bulk([
+            {'symbol': 'AAPL', 'price': 175.84, 'currency': 'USD', 'timestamp': '2025-01-01 09:30:00'},
+            {'symbol': '0700.HK', 'price': 320.5, 'currency': 'HKD'},
+        ])
+        self.adapter.save_prices_bulk([])
+
+        rows = self._query('SELECT symbol, price, currency, timestamp FROM price_data ORDER BY id')
+        self.assertEqual(rows, [
+            ('AAPL', 175.84, 'USD', '2025-01-01 09:30:00'),
+            ('0700.HK', 320.5, 'HKD', None),
+        ])
+
+    def test_batch_trigger_and_notify_marks_strategies_and_records_notifications(self):
+        ids = self.adapter.add_strategies([
+            ('苹果低价', 'AAPL', 'below', 170.0, 'buy'),
+            ('腾讯高价', '0700.HK', 'above', 350.0, 'notify'),
+            ('比特币', 'BTC', 'above', 65000.0, 'notify'),
+        ])
+        self.adapter.batch_trigger_and_notify([(ids[0], '苹果触发'), (ids[2], '比特币触发')])
+        self.adapter.batch_trigger_and_notify([])
+
+        self.assertEqual([s['id'] for s in self.adapter.get_active_strategies()], [ids[1]])
+        triggered = self._query("SELECT id FROM strategies WHERE status = 'triggered' "
+                                "AND triggered_at IS NOT NULL ORDER BY id")
+        self.assertEqual([row[0] for row in triggered], [ids[0], ids[2]])
+
+        # 同一秒内写入的通知按id倒序返回
+        notifications = self.adapter.get_recent_notifications(limit=10)
+        self.assertEqual([n['message'] for n in notifications], ['比特币触发', '苹果触发'])
+        self.assertEqual(self.adapter.get_strategies_summary(),
+                         {'total': 3, 'active': 1, 'triggered': 2, 'symbols': 1})
+
+    def test_cached_prices_round_trip_and_expiry(self):
+        now = int(time.time())
+        self.adapter.set_cached_prices([('fresh', '{"price": 1}', now + 60),
+                                        ('stale', '{"price": 2}', now - 1)])
+        # 同键覆盖
+        self.adapter.set_cached_prices([('fresh', '{"price": 3}', now + 60)])
+
+        self.assertEqual(self.adapter.get_cached_prices(['fresh', 'stale', 'missing'], now),
+                         {'fresh': ('{"price": 3}', now + 60)})
+
+
+class CloudflareD1BatchTest(unittest.TestCase):
+    """D1 批量写入: 每次调用只发送一个HTTP请求"""
+
+    def setUp(self):
+        self.adapter = CloudflareD1Adapter('db-id', 'account-id', 'token')
+        patcher = mock.patch.object(CloudflareD1Adapter, '_post_query',
+                                    return_value={'result': [{'results': []}]})
+        self.post_query = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.adapter.close)
+
+    def _batch(self):
+        self.assertEqual(self.post_query.call_count, 1)
+        return self.post_query.call_args.args[0]['batch']
+
+    def test_save_prices_bulk_sends_one_batch(self):
+        self.adapter.save_prices_bulk([
+            {'symbol': 'AAPL', 'price': 175.84},
+            {'symbol': 'BTC-USD', 'price': 64250.0, 'currency': 'USD', 'timestamp': 't'},
+        ])
+
+        batch = self._batch()
+        self.assertEqual([statement['params'] for statement in batch],
+                         [['AAPL', 175.84, 'USD', None], ['BTC-USD', 64250.0, 'USD', 't']])
+
+    def test_batch_trigger_and_notify_sends_one_batch(self):
+        self.adapter.batch_trigger_and_notify([(1, 'a'), (2, 'b')])
+
+        batch = self._batch()
+        self.assertEqual([statement['params'] for statement in batch], [[1], [2], [1, 'a'], [2, 'b']])
+
+    def test_set_cached_prices_sends_one_batch(self):
+        self.adapter.set_cached_prices([('k1', 'p1', 100), ('k2', 'p2', 200)])
+
+        batch = self._batch()
+        self.assertEqual([statement['params'] for statement in batch], [['k1', 'p1', 100], ['k2', 'p2', 200]])
+
+    def test_empty_batches_send_nothing(self):
+        self.adapter.save_prices_bulk([])
+        self.adapter.batch_trigger_and_notify([])
+        self.adapter.set_cached_prices([])
+
+        self.post_query.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
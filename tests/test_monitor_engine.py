@@ -0,0 +1,97 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import contextlib
+import io
+import tempfile
+import threading
+import time
+import unittest
+
+from monitor.engine import MonitorEngine, _next_run_time
+
+
+class NextRunTimeTest(unittest.TestCase):
+    """下一次检查时间的节拍推进"""
+
+    def test_keeps_fixed_cadence(self):
+        # 检查耗时小于间隔: 按原节拍推进，不累积检查耗时
+        self.assertEqual(_next_run_time(10.0, 10.5, 5.0), 15.0)
+
+    def test_restarts_from_now_when_behind(self):
+        # 检查耗时超过多个间隔: 从当前时间重新计时，只补跑一次
+        self.assertEqual(_next_run_time(10.0, 23.0, 5.0), 23.0)
+
+
+class MonitorLoopTest(unittest.TestCase):
+    """异步监控主循环: 停止事件与落后补跑"""
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self._tmpdir.name, 'monitor.db')
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.engine = MonitorEngine({
+                'db_path': db_path,
+                'database': {'type': 'sqlite', 'path': db_path},
+                'monitoring': {'check_interval': 3600}
+            })
+        self.cycle_starts = []
+
+    def tearDown(self):
+        self.engine.strategy_manager.db.close()
+        self._tmpdir.cleanup()
+
+    def _start_loop_thread(self):
+        """在后台线程中运行监控主循环，等待事件循环就绪"""
+        self.engine.is_running = True
+        thread = threading.Thread(target=asyncio.run, args=(self.engine._monitor_loop(),), daemon=True)
+        thread.start()
+        deadline = time.monotonic() + 5
+        while self.engine._loop is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIsNotNone(self.engine._loop)
+        return thread
+
+    def test_stop_event_ends_loop_without_waiting_for_interval(self):
+        async def cycle():
+            self.cycle_starts.append(time.monotonic())
+        self.engine.arun_check_cycle = cycle
+
+        thread = self._start_loop_thread()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.engine.stop_monitoring()
+        thread.join(timeout=2)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(self.cycle_starts, [])
+        self.assertIsNone(self.engine._loop)
+
+    def test_slow_cycle_catches_up_once(self):
+        interval = 0.05
+        self.engine.check_interval = interval
+
+        async def cycle():
+            self.cycle_starts.append(time.monotonic())
+            if len(self.cycle_starts) == 1:
+                # 第一次检查耗时约6个间隔
+                await asyncio.sleep(interval * 6)
+            elif len(self.cycle_starts) == 3:
+                self.engine.stop_monitoring()
+        self.engine.arun_check_cycle = cycle
+
+        thread = self._start_loop_thread()
+        with contextlib.redirect_stdout(io.StringIO()):
+            thread.join(timeout=5)
+
+        self.assertFalse(thread.is_alive())
+        first, second, third = self.cycle_starts
+        # 落后后立即补跑一次，之后恢复按间隔检查，而不是连续补跑错过的每一次
+        self.assertLess(second - first, interval * 8)
+        self.assertGreaterEqual(second - first, interval * 6)
+        self.assertGreaterEqual(third - second, interval * 0.9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+import web.server as server
+from web.server import WebServer
+
+
+class WebServerTestCase(unittest.TestCase):
+    """基于临时SQLite数据库的Web服务器"""
+
+    db_path = None
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        db_path = self.db_path or os.path.join(self._tmpdir.name, 'stock_monitor.db')
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.server = WebServer({
+                'db_path': db_path,
+                'database': {'type': 'sqlite', 'path': db_path},
+                'web': {'log_file': os.path.join(self._tmpdir.name, 'web_server.log')}
+            })
+        self.client = self.server.app.test_client()
+        self.db = self.server.strategy_manager.db
+
+    def tearDown(self):
+        self.server.strategy_manager.price_store.stop()
+        while not self.server._read_pool.empty():
+            self.server._read_pool.get_nowait().close()
+        self.db.close()
+        self._tmpdir.cleanup()
+
+    def _notifications(self, query='', headers=None):
+        return self.client.get('/api/notifications' + query, headers=headers or {})
+
+
+class ReadPoolTest(WebServerTestCase):
+    """只读连接池: 按需打开、打开失败回退、借用超时"""
+
+    def test_connections_open_on_first_borrow(self):
+        self.assertEqual(self.server._pool_size, 0)
+
+        self.assertEqual(self._notifications().get_json(), [])
+        self.assertEqual(self.server._pool_size, 1)
+
+    def test_failed_open_returns_empty_list_and_frees_slot(self):
+        self.server._db_path = os.path.join(self._tmpdir.name, 'missing', 'stock_monitor.db')
+
+        response = self._notifications()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), [])
+        self.assertEqual(self.server._pool_size, 0)
+
+    def test_exhausted_pool_times_out_instead_of_hanging(self):
+        held = [self.server._open_pooled_connection() for _ in range(server._READ_POOL_SIZE)]
+        try:
+            with mock.patch.object(server, '_READ_POOL_TIMEOUT', 0.05):
+                self.assertEqual(self._notifications().get_json(), [])
+        finally:
+            for conn in held:
+                self.server._read_pool.put(conn)
+
+    def test_streaming_export_does_not_hold_pool_connection(self):
+        strategy_id = self.db.add_strategy('苹果', 'AAPL', 'above', 1.0, 'notify')
+        self.db.add_notifications_bulk([(strategy_id, f'通知{i}') for i in range(3)])
+
+        response = self._notifications('?limit=1000')
+        body = b''.join(response.response)
+        response.close()
+
+        self.assertEqual(len(json.loads(body)), 3)
+        self.assertEqual(self.server._pool_size, 0)
+
+
+class MemoryDatabaseTest(WebServerTestCase):
+    """:memory: 数据库不使用连接池，经由数据库适配器查询"""
+
+    db_path = ':memory:'
+
+    def test_notifications_are_read_through_adapter(self):
+        strategy_id = self.db.add_strategy('苹果', 'AAPL', 'above', 1.0, 'notify')
+        self.db.add_notification(strategy_id, 'x' * 150)
+
+        notifications = self._notifications().get_json()
+        self.assertIsNone(self.server._db_path)
+        self.assertEqual(len(notifications), 1)
+        self.assertEqual(notifications[0]['message'], 'x' * 100 + '...')
+        self.assertEqual(notifications[0]['strategy_name'], '苹果')
+
+
+class ConditionalResponseTest(WebServerTestCase):
+    """ETag / 304 条件请求"""
+
+    def setUp(self):
+        super().setUp()
+        self.strategy_ids = self.db.add_strategies([
+            ('苹果', 'AAPL', 'above', 1.0, 'notify'),
+            ('腾讯', '0700.HK', 'above', 1.0, 'notify'),
+            ('比特币', 'BTC', 'above', 1.0, 'notify'),
+        ])
+
+    def test_unchanged_notifications_return_304(self):
+        self.db.batch_trigger_and_notify([(self.strategy_ids[0], 'a')])
+        etag = self._notifications().headers['ETag']
+
+        response = self._notifications(headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+
+    def test_new_notifications_in_same_second_change_etag_at_limit(self):
+        self.db.batch_trigger_and_notify([(self.strategy_ids[0], 'a'), (self.strategy_ids[1], 'b')])
+        etag = self._notifications('?limit=2').headers['ETag']
+
+        # 条数已达limit，新通知与上一批的 sent_at 处于同一秒
+        self.db.batch_trigger_and_notify([(self.strategy_ids[2], 'c')])
+        self.server.clear_cache()
+
+        response = self._notifications('?limit=2', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual([n['message'] for n in response.get_json()], ['c', 'b'])
+
+    def test_stats_etag_follows_summary(self):
+        etag = self.client.get('/api/stats').headers['ETag']
+        self.assertEqual(self.client.get('/api/stats', headers={'If-None-Match': etag}).status_code, 304)
+
+        self.db.batch_trigger_and_notify([(self.strategy_ids[0], 'a')])
+        self.server.clear_cache()
+
+        response = self.client.get('/api/stats', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['triggered'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
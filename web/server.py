@@ -2,11 +2,134 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from flask import Flask, render_template, jsonify
+from flask import Flask, Response, render_template, jsonify, request
+from werkzeug.exceptions import HTTPException
+import atexit
+import functools
+import hashlib
+import json
+import logging
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple, Union
 from strategy.manager import StrategyManager
 
+try:
+    import orjson
+except ImportError:  # 未安装orjson时回退到Flask的jsonify
+    orjson = None  # type: ignore[assignment]
+
+
+logger = logging.getLogger('web.server')
+
+# 返回给客户端的通用错误信息（具体异常只写入日志）
+_INTERNAL_ERROR = {'error': '服务器内部错误'}
+
+# Web日志文件滚动策略: 单个文件5MB，保留3个备份
+_LOG_MAX_BYTES = 5 * 1024 * 1024
+_LOG_BACKUP_COUNT = 3
+
+# 只读连接池大小（Flask线程模式下并发处理请求的读取连接数）
+_READ_POOL_SIZE = 5
+# 连接池满时等待其他请求归还连接的最长时间（秒）
+_READ_POOL_TIMEOUT = 5.0
+
+# 只读连接配置: 64MB页缓存 + 内存临时表，写锁被占用时最多等待30秒
+_READ_PRAGMAS = '''
+    PRAGMA cache_size=-65536;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA busy_timeout=30000;
+'''
+
+# 仪表盘数据的内存缓存有效期（秒）: 页面轮询期间大部分请求不访问SQLite
+_STATS_CACHE_TTL = 2.0
+_NOTIFICATIONS_CACHE_TTL = 3.0
+
+# 可条件请求接口的客户端缓存时间
+_CACHE_CONTROL = 'max-age=2'
+
+# 通知接口的默认/最大条数；超过流式阈值时逐行序列化输出，不一次性载入内存
+_DEFAULT_NOTIFICATIONS_LIMIT = 50
+_MAX_NOTIFICATIONS_LIMIT = 10000
+_STREAM_NOTIFICATIONS_THRESHOLD = 500
+
+# 通知消息预览长度（超出部分以 ... 省略）
+_MESSAGE_PREVIEW_LEN = 100
+
+_RECENT_NOTIFICATIONS_SQL = '''
+    SELECT n.id, n.message, n.sent_at, s.name as strategy_name
+    FROM notifications n
+    LEFT JOIN strategies s ON n.strategy_id = s.id
+    ORDER BY n.sent_at DESC, n.id DESC
+    LIMIT ?
+'''
+
+
+# 秒级时间戳缓存 [epoch秒, ISO字符串]: 同一秒内的请求复用同一个字符串
+_iso_cache: list = [0, '']
+
+
+def _now_iso() -> str:
+    """当前本地时间的ISO字符串（精确到秒）"""
+    now = int(time.time())
+    if _iso_cache[0] != now:
+        _iso_cache[:] = [now, datetime.fromtimestamp(now).isoformat()]
+    return _iso_cache[1]
+
+
+def _dumps(obj: Any) -> bytes:
+    """序列化为JSON bytes - 优先使用orjson"""
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+def _json(obj: Any, status: int = 200) -> Response:
+    """构建JSON响应 - 优先使用orjson直接序列化为bytes"""
+    if orjson:
+        return Response(orjson.dumps(obj), status=status, mimetype='application/json')
+    response = jsonify(obj)
+    response.status_code = status
+    return response
+
+
+@functools.cache
+def _start_log_listener(log_file: str) -> QueueListener:
+    """Web日志走队列: 请求线程只入队，由后台监听线程写入滚动日志文件（同一文件只启动一次）"""
+    log_queue: 'queue.Queue[logging.LogRecord]' = queue.Queue(-1)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    
+    file_handler = RotatingFileHandler(log_file, maxBytes=_LOG_MAX_BYTES,
+                                       backupCount=_LOG_BACKUP_COUNT, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    
+    listener = QueueListener(log_queue, file_handler)
+    listener.start()
+    # 退出时写完队列中剩余的日志
+    atexit.register(listener.stop)
+    return listener
+
+
+def _conditional_json(etag_source: Tuple, build: Callable[[], Any]) -> Response:
+    """带弱ETag的JSON响应 - 客户端If-None-Match命中时直接返回304，不构建和序列化响应体"""
+    digest = hashlib.blake2b(repr(etag_source).encode('utf-8'), digest_size=8).hexdigest()
+    etag = f'W/"{digest}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = Response(status=304)
+    else:
+        response = _json(build())
+    
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = _CACHE_CONTROL
+    return response
+
 
 class WebServer:
     def __init__(self, config):
@@ -14,123 +137,210 @@ class WebServer:
                         template_folder='templates',
                         static_folder='static')
         self.config = config
-        self.strategy_manager = StrategyManager(config.get('db_path', 'stock_monitor.db'))
+        _start_log_listener(config.get('web', {}).get('log_file', 'web_server.log'))
+        self.strategy_manager = StrategyManager(config=config)
+        # 后台定期刷新活跃标的价格，页面和API直接读取内存快照
+        refresh_interval = config.get('monitoring', {}).get('price_refresh_seconds', 30)
+        self.strategy_manager.start_price_store(refresh_interval)
+        
+        # 通知查询使用只读连接池，每个请求借用/归还连接（首次借用时才打开，最多_READ_POOL_SIZE个）；
+        # 只有本地SQLite文件库使用连接池，D1 / :memory: 经由数据库适配器查询
+        db_config = config.get('database', {})
+        db_path = db_config.get('path') or config.get('db_path', 'stock_monitor.db')
+        is_sqlite_file = db_config.get('type', 'sqlite') == 'sqlite' and db_path != ':memory:'
+        self._db_path: Optional[str] = db_path if is_sqlite_file else None
+        self._read_pool: 'queue.Queue[sqlite3.Connection]' = queue.Queue()
+        self._pool_size = 0
+        self._pool_lock = threading.Lock()
+        
+        # 查询结果缓存: key -> (过期时间, 结果)
+        self._cache: Dict[Hashable, Tuple[float, Any]] = {}
+        self._cache_lock = threading.Lock()
         
         # 注册路由
         self.setup_routes()
     
     def setup_routes(self):
+        @self.app.errorhandler(Exception)
+        def handle_error(e):
+            """统一错误处理 - 记录异常日志，向客户端只返回通用错误信息"""
+            # 404/405等HTTP错误保持Flask默认响应
+            if isinstance(e, HTTPException):
+                return e
+            
+            logger.exception("请求处理失败: %s %s", request.method, request.path)
+            if request.path.startswith('/api/'):
+                return _json(_INTERNAL_ERROR, 500)
+            return "加载数据出错", 500
+        
         @self.app.route('/')
         def index():
             """主页 - 显示策略和通知概览"""
-            try:
-                # 获取策略统计
-                status = self.strategy_manager.get_strategy_status()
-                
-                # 获取活跃策略及其当前价格
-                strategies = self.strategy_manager.get_strategies_with_current_prices()
-                
-                # 获取最近通知
-                notifications = self.get_recent_notifications()
-                
-                # 统计监控的股票数量
-                symbols_count = len(status['by_symbol'])
-                
-                stats = {
-                    'total': status['summary']['total'],
-                    'active': status['summary']['active'],
-                    'triggered': status['summary']['triggered'],
-                    'symbols': symbols_count
-                }
-                
-                return render_template('index.html')
-            
-            except Exception as e:
-                return f"加载数据出错: {e}", 500
+            # 页面数据由前端通过 /api/* 接口加载，这里只渲染模板
+            return render_template('index.html')
         
         @self.app.route('/api/strategies')
         def api_strategies():
             """API - 获取所有策略"""
-            try:
-                strategies = self.strategy_manager.get_strategies_with_current_prices()
-                return jsonify(strategies)
-            except Exception as e:
-                return jsonify({'error': str(e)}), 500
+            strategies = self.strategy_manager.get_strategies_with_current_prices()
+            return _json(strategies)
         
         @self.app.route('/api/notifications')
         def api_notifications():
             """API - 获取通知历史"""
-            try:
-                notifications = self.get_recent_notifications(limit=50)
-                return jsonify(notifications)
-            except Exception as e:
-                return jsonify({'error': str(e)}), 500
+            limit = request.args.get('limit', _DEFAULT_NOTIFICATIONS_LIMIT, type=int)
+            limit = min(max(limit, 1), _MAX_NOTIFICATIONS_LIMIT)
+            if limit > _STREAM_NOTIFICATIONS_THRESHOLD and self._db_path is not None:
+                # 大批量导出: 游标逐行读取并输出；使用独立的短连接，慢客户端不占用连接池
+                try:
+                    conn = self._open_read_connection(self._db_path)
+                except sqlite3.Error:
+                    logger.exception("获取通知记录失败")
+                    return _json([])
+                return Response(self._stream_notifications(conn, limit), mimetype='application/json')
+            
+            latest_id, notifications = self._recent_notifications(limit)
+            # 通知只会新增，以条数和最大通知id作为版本（sent_at只精确到秒，同一秒内会批量写入多条）
+            return _conditional_json((len(notifications), latest_id), lambda: notifications)
         
         @self.app.route('/api/stats')
         def api_stats():
             """API - 获取统计信息"""
-            try:
-                status = self.strategy_manager.get_strategy_status()
-                symbols_count = len(status['by_symbol'])
-                
-                stats = {
-                    'total': status['summary']['total'],
-                    'active': status['summary']['active'],
-                    'triggered': status['summary']['triggered'],
-                    'symbols': symbols_count,
-                    'last_updated': datetime.now().isoformat()
+            summary = self._cached(('stats',), _STATS_CACHE_TTL, self.strategy_manager.get_summary)
+            
+            # 统计数字不变时返回304（last_updated 只在数据变化时刷新）
+            return _conditional_json(
+                (summary['total'], summary['active'], summary['triggered'], summary['symbols']),
+                lambda: {
+                    'total': summary['total'],
+                    'active': summary['active'],
+                    'triggered': summary['triggered'],
+                    'symbols': summary['symbols'],
+                    'last_updated': _now_iso()
                 }
-                
-                return jsonify(stats)
-            except Exception as e:
-                return jsonify({'error': str(e)}), 500
+            )
         
         @self.app.route('/api/trigger-check')
         def api_trigger_check():
             """API - 手动触发检查"""
-            try:
-                triggered = self.strategy_manager.check_strategy_triggers()
-                
-                return jsonify({
-                    'success': True,
-                    'triggered_count': len(triggered),
-                    'triggered_strategies': [t['strategy']['name'] for t in triggered],
-                    'timestamp': datetime.now().isoformat()
-                })
-            except Exception as e:
-                return jsonify({'error': str(e)}), 500
+            triggered = self.strategy_manager.check_strategy_triggers()
+            # 触发会改变策略状态和通知记录，清空缓存使页面立即看到最新数据
+            self.clear_cache()
+            
+            return _json({
+                'success': True,
+                'triggered_count': len(triggered),
+                'triggered_strategies': [t['strategy']['name'] for t in triggered],
+                'timestamp': _now_iso()
+            })
+    
+    @staticmethod
+    def _open_read_connection(db_path: str) -> sqlite3.Connection:
+        """打开并配置只读查询用的SQLite连接（只读模式 + 自动提交，可跨线程借用）"""
+        # mode=ro: 连接不会写库，也不参与写锁竞争
+        uri = Path(db_path).resolve().as_uri() + '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+        conn.executescript(_READ_PRAGMAS)
+        # 按列名取值；连接长期复用，sqlite3内置的语句缓存使相同SQL无需重复解析
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    @contextmanager
+    def _borrow(self) -> Iterator[sqlite3.Connection]:
+        """从连接池借用一个只读连接，用完后归还（池中无空闲且未满时新开连接，打开失败时抛出sqlite3.Error）"""
+        try:
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            conn = self._open_pooled_connection()
+        try:
+            yield conn
+        finally:
+            self._read_pool.put(conn)
+    
+    def _open_pooled_connection(self) -> sqlite3.Connection:
+        """为连接池新开一个只读连接；连接数已达上限时等待其他请求归还"""
+        with self._pool_lock:
+            can_open = self._pool_size < _READ_POOL_SIZE
+            if can_open:
+                self._pool_size += 1
+        if not can_open:
+            # 等待超时抛出queue.Empty，由调用方按查询失败处理
+            return self._read_pool.get(timeout=_READ_POOL_TIMEOUT)
+        
+        try:
+            return self._open_read_connection(self._db_path)
+        except Exception:
+            # 数据库文件不存在等情况: 不占用名额，下次请求重试
+            with self._pool_lock:
+                self._pool_size -= 1
+            raise
+    
+    def _cached(self, key: Hashable, ttl: float, loader: Callable[[], Any]) -> Any:
+        """返回未过期的缓存结果，否则调用loader并缓存ttl秒（loader异常时不缓存）"""
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+        
+        value = loader()
+        with self._cache_lock:
+            self._cache[key] = (now + ttl, value)
+        return value
+    
+    def clear_cache(self) -> None:
+        """清空查询结果缓存"""
+        with self._cache_lock:
+            self._cache.clear()
     
     def get_recent_notifications(self, limit=20):
-        """获取最近的通知记录"""
+        """获取最近的通知记录（短时间缓存）"""
+        return self._recent_notifications(limit)[1]
+    
+    def _recent_notifications(self, limit: int) -> Tuple[Optional[int], List[Dict[str, Optional[str]]]]:
+        """获取 (最大通知id, 最近的通知记录)，短时间缓存；查询失败时返回空列表"""
         try:
-            with sqlite3.connect(self.config.get('db_path', 'stock_monitor.db')) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT n.message, n.sent_at, s.name as strategy_name
-                    FROM notifications n
-                    LEFT JOIN strategies s ON n.strategy_id = s.id
-                    ORDER BY n.sent_at DESC
-                    LIMIT ?
-                ''', (limit,))
-                
-                notifications = []
-                for row in cursor.fetchall():
-                    # 简化消息显示
-                    message = row[0]
-                    if len(message) > 100:
-                        message = message[:100] + "..."
-                    
-                    notifications.append({
-                        'message': message,
-                        'sent_at': row[1],
-                        'strategy_name': row[2]
-                    })
-                
-                return notifications
+            return self._cached(('notifications', limit), _NOTIFICATIONS_CACHE_TTL,
+                                lambda: self._load_recent_notifications(limit))
+        except Exception:
+            logger.exception("获取通知记录失败")
+            return None, []
+    
+    def _load_recent_notifications(self, limit: int) -> Tuple[Optional[int], List[Dict[str, Optional[str]]]]:
+        """从数据库读取最近的通知记录及其中的最大通知id"""
+        if self._db_path is None:
+            rows = self.strategy_manager.db.get_recent_notifications(limit)
+        else:
+            with self._borrow() as conn:
+                rows = conn.execute(_RECENT_NOTIFICATIONS_SQL, (limit,)).fetchall()
+        
+        latest_id = max((row['id'] for row in rows), default=None)
+        return latest_id, [self._notification_row(row) for row in rows]
+    
+    def _stream_notifications(self, conn: sqlite3.Connection, limit: int) -> Iterator[bytes]:
+        """逐行读取并序列化通知记录，内存占用与条数无关（生成器结束或被关闭时关闭连接）"""
+        with closing(conn):
+            cursor = conn.execute(_RECENT_NOTIFICATIONS_SQL, (limit,))
+            
+            yield b'['
+            separator = b''
+            for row in cursor:
+                yield separator + _dumps(self._notification_row(row))
+                separator = b','
+            yield b']'
+    
+    @staticmethod
+    def _notification_row(row: Union[sqlite3.Row, Dict[str, Any]]) -> Dict[str, Optional[str]]:
+        """通知记录行 -> 接口数据（简化消息显示）"""
+        message = row['message']
+        if len(message) > _MESSAGE_PREVIEW_LEN:
+            message = message[:_MESSAGE_PREVIEW_LEN] + "..."
         
-        except Exception as e:
-            print(f"获取通知记录失败: {e}")
-            return []
+        return {
+            'message': message,
+            'sent_at': row['sent_at'],
+            'strategy_name': row['strategy_name']
+        }
     
     def run(self, host='127.0.0.1', port=5000, debug=False):
         """启动Web服务器"""
@@ -138,7 +348,8 @@ class WebServer:
         print(f"📱 访问地址: http://{host}:{port}")
         print(f"🔧 调试模式: {'开启' if debug else '关闭'}")
         
-        self.app.run(host=host, port=port, debug=debug)
+        # 每个请求一个线程，仪表盘并发的API请求互不阻塞（读连接池、缓存均为线程安全）
+        self.app.run(host=host, port=port, debug=debug, threaded=True)
 
 
 def create_web_server(config):